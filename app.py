@@ -1,59 +1,121 @@
 import streamlit as st
 import pandas as pd
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import requests
 from technical_analysis import TechnicalAnalysisUI
+from config.constants import (
+    API_BASE_URL,
+    HEALTH_POLL_INTERVAL,
+    HEALTH_CACHE_TTL,
+    TECHNICAL_PREFETCH_TOP_N,
+    HISTORY_PREFETCH_TOP_N,
+    TECHNICAL_INDICATOR_SOURCE,
+    TECHNICAL_HISTORY_TIMEFRAME,
+    TECHNICAL_PREFETCH_WORKERS,
+    TECHNICAL_CACHE_TTL,
+    SCANNER_PAGE_SIZES,
+    LIVE_STREAM_PATH,
+    LIVE_REFRESH_INTERVAL,
+    CANDLE_STORE_DIR,
+    SCAN_RECORDER_DIR,
+    PROFILER_CAPACITY,
+    COIN_PICKER_LIMIT,
+    TOP_MOVERS_K_OPTIONS,
+    ALERT_HISTORY,
+    ALERT_DEFAULT_COOLDOWN,
+    ALERT_WORKERS,
+    ALERT_REFRESH_INTERVAL,
+    LIGHT_THEME,
+    SCAN_UNIVERSE_LIMIT,
+    SCAN_CACHE_TTLS,
+    SCAN_PREFETCH_WORKERS,
+    SCAN_PREVIEW_ROWS,
+)
+from components.cards import render_alert_card
+from modules.alerts import AlertEngine, AlertRule, RULE_FIELDS, RULE_OPERATORS
+from modules.api_client import VortexAPIClient, PriceStream
+from modules.candle_store import CandleStore
+from modules.fragment_cache import fragments
+from modules.health_monitor import HealthMonitor
+from modules.metrics import registry as metrics_registry
+from modules.profiler import RerunProfiler, active_trace, span
+from modules.prefetch import TechnicalPrefetcher
+from modules.streaming_indicators import IndicatorBook
+from modules.scan_cache import ScanCache
+from modules.scan_recorder import ScanRecorder, scan_timestamp
+from modules.scheduler import BACKGROUND
+from modules.shared_cache import shared_cache
+from modules.scan_store import ScanSnapshot, SCAN_SORT_FIELDS, TIMEFRAME_CHANGE_FIELDS, preview_table
 
-# --- CONSTANTS ---
-API_BASE_URL = "https://server-test-ovta.onrender.com/api"
-
-# --- API CLIENT ---
-class VortexAPIClient:
-    def __init__(self, base_url):
-        self.base_url = base_url
-        self.session = requests.Session()
-        self.timeout = 30
-        self.request_count = 0
-
-    def get_health_status(self):
-        """دریافت وضعیت سلامت سرور"""
-        try:
-            response = self.session.get(f"{self.base_url}/health-combined", timeout=self.timeout)
-            self.request_count += 1
-            return response.json()
-        except Exception as e:
-            return {
-                "status": "offline",
-                "error": str(e),
-                "websocket_status": {"connected": False, "active_coins": 0},
-                "api_status": {"requests_count": self.request_count},
-                "gist_status": {"total_coins": 0}
-            }
-
-    def scan_market(self, limit=100, filter_type="volume", timeframe="24h"):
-        """اسکن واقعی مارکت با تایم‌فریم"""
-        try:
-            params = {
-                "limit": limit,
-                "filter": filter_type
-            }
-            st.info(f"🔍 Scanning market with {limit} coins ({timeframe})...")
-            response = self.session.get(
-                f"{self.base_url}/scan/vortexai",
-                params=params,
-                timeout=self.timeout
-            )
-            self.request_count += 1
-            data = response.json()
-            if data.get("success"):
-                st.success(f"✅ Received {len(data.get('coins', []))} coins ({timeframe})")
-                return data
-            else:
-                st.error(f"❌ Scan failed: {data.get('error', 'Unknown error')}")
-                return None
-        except Exception as e:
-            st.error(f"🔍 API Error: {str(e)}")
-            return None
+
+@st.cache_resource
+def get_health_monitor():
+    """پایشگر سلامت مشترک برای کل پروسه"""
+    monitor = HealthMonitor(
+        VortexAPIClient(API_BASE_URL, priority=BACKGROUND),
+        interval=HEALTH_POLL_INTERVAL,
+        ttl=HEALTH_CACHE_TTL
+    )
+    monitor.start()
+    return monitor
+
+@st.cache_resource
+def get_candle_store():
+    """کش دائمی کندل‌ها روی دیسک (مشترک بین sessionها)"""
+    return CandleStore(CANDLE_STORE_DIR)
+
+@st.cache_resource
+def get_scan_recorder():
+    """تاریخچه ستونی اسکن‌ها روی دیسک (مشترک بین sessionها)"""
+    return ScanRecorder(SCAN_RECORDER_DIR)
+
+@st.cache_resource
+def get_technical_prefetcher():
+    """پیش‌واکش مشترک تحلیل تکنیکال برای کل پروسه"""
+    # کش دیسک یک بار در thread اسکریپت گرفته می‌شود - workerها به st دسترسی ندارند
+    candle_store = get_candle_store()
+    return TechnicalPrefetcher(
+        lambda: VortexAPIClient(API_BASE_URL, priority=BACKGROUND, candle_store=candle_store),
+        max_workers=TECHNICAL_PREFETCH_WORKERS,
+        ttl=TECHNICAL_CACHE_TTL
+    )
+
+@st.cache_resource
+def get_indicator_book():
+    """وضعیت اندیکاتورهای زنده مشترک برای کل پروسه"""
+    return IndicatorBook()
+
+@st.cache_resource
+def get_price_stream():
+    """اتصال دائمی استریم قیمت مشترک برای کل پروسه"""
+    return PriceStream(
+        API_BASE_URL,
+        path=LIVE_STREAM_PATH,
+        on_tick=get_indicator_book().on_tick
+    )
+
+@st.cache_resource
+def get_scan_cache():
+    """کش اسکن هر تایم‌فریم با پیش‌واکشی پس‌زمینه (مشترک بین sessionها)"""
+    return ScanCache(
+        lambda: VortexAPIClient(API_BASE_URL, priority=BACKGROUND),
+        SCAN_CACHE_TTLS,
+        max_workers=SCAN_PREFETCH_WORKERS
+    )
+
+@st.cache_resource
+def get_alert_executor():
+    """worker مشترک ارزیابی قوانین هشدار (موتور هر session در آن صف می‌شود)"""
+    return ThreadPoolExecutor(max_workers=ALERT_WORKERS, thread_name_prefix="vortex-alerts")
+
+def format_age(seconds):
+    """نمایش سن داده به صورت خوانا"""
+    if seconds is None:
+        return "waiting..."
+    if seconds < 60:
+        return f"{seconds:.0f}s ago"
+    return f"{seconds / 60:.0f}m ago"
 
 # =============================== GLASS DESIGN SYSTEM ==============================
 
@@ -256,6 +318,11 @@ def render_timeframe_selector():
     }
 
     # استفاده از radio button بدون دایره
+    # مقدار اولیه رادیو همان تایم‌فریم اسکن فعلی است
+    if "timeframe_radio" not in st.session_state:
+        labels = {value: label for label, value in timeframe_options.items()}
+        st.session_state.timeframe_radio = labels.get(st.session_state.selected_timeframe, "1H")
+
     selected = st.radio(
         "Timeframe",
         options=list(timeframe_options.keys()),
@@ -290,100 +357,115 @@ def render_timeframe_selector():
 
 def render_metric_card(title, value, change=None):
     """کارت متریک شیشه‌ای"""
-    change_html = ""
-    if change is not None:
-        change_color = "text-success" if change >= 0 else "text-error"
-        change_icon = "📈" if change >= 0 else "📉"
-        change_html = f'<div class="{change_color}" style="font-size: 0.9rem; margin-top: 0.5rem;">{change_icon} {change:+.2f}%</div>'
-
-    st.markdown(f"""
+    def build():
+        change_html = ""
+        if change is not None:
+            change_color = "text-success" if change >= 0 else "text-error"
+            change_icon = "📈" if change >= 0 else "📉"
+            change_html = f'<div class="{change_color}" style="font-size: 0.9rem; margin-top: 0.5rem;">{change_icon} {change:+.2f}%</div>'
+        return f"""
     <div class="glass-metric">
         <div class="text-secondary" style="font-size: 0.9rem;">{title}</div>
         <div class="text-primary" style="font-size: 1.8rem; margin: 0.5rem 0;">{value}</div>
         {change_html}
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+    st.markdown(fragments.render("metric_card", (title, value, change), build), unsafe_allow_html=True)
 
 def render_coin_card_clean(coin):
-    """کارت کوین با فیلدهای صحیح درصد تغییرات برای 3 تایم‌فریم اصلی"""
-    
-    # پیدا کردن درصد تغییرات بر اساس تایم‌فریم انتخاب شده
-    def get_price_change_by_timeframe(coin_data, timeframe):
-        """گرفتن درصد تغییرات بر اساس تایم‌فریم"""
-        timeframe_map = {
-            "1h": "priceChange1h",   # 1 ساعت
-            "24h": "priceChange1d",  # 1 روز
-            "7d": "priceChange1w"    # 1 هفته
-        }
-        
-        change_field = timeframe_map.get(timeframe, "priceChange1d")
-        change_value = coin_data.get(change_field, 0)
-        
-        return change_value if change_value is not None else 0
-    
-    # گرفتن درصد تغییرات بر اساس تایم‌فریم انتخاب شده
+    """کارت کوین (Coin نرمال‌شده) با درصد تغییرات تایم‌فریم انتخاب شده"""
     current_timeframe = st.session_state.selected_timeframe
-    change_value = get_price_change_by_timeframe(coin, current_timeframe)
-    
-    change_color = "text-success" if change_value >= 0 else "text-error"
-    change_icon = "📈" if change_value >= 0 else "📉"
+    change_value = coin.change(current_timeframe)
+    price, volume = coin.price, coin.volume
     
-    vortex_data = coin.get('VortexAI_analysis', {})
-    
-    # استفاده از کامپوننت‌های خالص Streamlit
-    with st.container():
-        col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
-        
-        with col1:
-            # نماد و نام
-            st.markdown(f"**{coin.get('symbol', 'N/A')}**")
-            st.markdown(f"<div class='text-secondary' style='font-size: 0.8rem;'>{coin.get('name', 'Unknown')}</div>", unsafe_allow_html=True)
-            
-            # آنومالی حجم
-            if vortex_data.get('volume_anomaly'):
-                st.markdown("<div class='anomaly-badge'>∆ Anomaly</div>", unsafe_allow_html=True)
-        
-        with col2:
-            # قیمت - اولویت‌بندی شده
-            price = (
-                coin.get('realtime_price') or 
-                coin.get('price') or 
-                0
-            )
-            st.markdown(f"<div class='text-primary' style='font-size: 1.1rem; font-weight: bold; text-align: center;'>${price:,.2f}</div>", unsafe_allow_html=True)
-            
-            # درصد تغییرات در دکمه سفید - حالا با مقدار واقعی
-            st.markdown(f"""
-            <div class='value-badge'>
-                <div class='{change_color}' style='font-size: 0.9rem;'>
-                    {change_icon} {change_value:+.2f}%
+    # فقط فیلدهای نمایشی در کلید - کوین بدون تغییر HTML قبلی را دوباره استفاده می‌کند
+    key = (
+        coin.symbol, coin.name, price, volume, current_timeframe, change_value,
+        coin.signal_strength, coin.volume_anomaly,
+    )
+
+    def build():
+        change_color = "text-success" if change_value >= 0 else "text-error"
+        change_icon = "📈" if change_value >= 0 else "📉"
+        anomaly_html = "<div class='anomaly-badge'>∆ Anomaly</div>" if coin.volume_anomaly else ""
+        return f"""
+        <div style='display: flex; align-items: center; gap: 1rem;'>
+            <div style='flex: 3;'>
+                <div class='text-primary' style='font-weight: bold;'>{coin.symbol}</div>
+                <div class='text-secondary' style='font-size: 0.8rem;'>{coin.name}</div>
+                {anomaly_html}
+            </div>
+            <div style='flex: 2;'>
+                <div class='text-primary' style='font-size: 1.1rem; font-weight: bold; text-align: center;'>${price:,.2f}</div>
+                <div class='value-badge'>
+                    <div class='{change_color}' style='font-size: 0.9rem;'>
+                        {change_icon} {change_value:+.2f}%
+                    </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            # سیگنال AI در دکمه سفید
-            st.markdown("<div class='text-secondary' style='font-size: 0.8rem; text-align: center;'>Signal</div>", unsafe_allow_html=True)
-            st.markdown(f"""
-            <div class='value-badge'>
-                <div class='text-signal' style='font-size: 1rem; font-weight: bold;'>
-                    {vortex_data.get('signal_strength', 0):.1f}/10
+            <div style='flex: 2;'>
+                <div class='text-secondary' style='font-size: 0.8rem; text-align: center;'>Signal</div>
+                <div class='value-badge'>
+                    <div class='text-signal' style='font-size: 1rem; font-weight: bold;'>
+                        {coin.signal_strength:.1f}/10
+                    </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            # حجم - اولویت‌بندی شده
-            volume = (
-                coin.get('realtime_volume') or 
-                coin.get('volume') or 
-                0
-            )
-            st.markdown("<div class='text-secondary' style='font-size: 0.8rem; text-align: center;'>Volume</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='text-primary' style='font-size: 0.9rem; text-align: center;'>${volume/1000000:,.1f}M</div>", unsafe_allow_html=True)
-        
-        # جداکننده خط
-        st.markdown("---")
+            <div style='flex: 2;'>
+                <div class='text-secondary' style='font-size: 0.8rem; text-align: center;'>Volume</div>
+                <div class='text-primary' style='font-size: 0.9rem; text-align: center;'>${volume/1000000:,.1f}M</div>
+            </div>
+        </div>
+        <hr>
+        """
+
+    # کل کارت در یک المان
+    st.markdown(fragments.render("coin_card_clean", key, build), unsafe_allow_html=True)
+
+SCANNER_COLUMN_CONFIG = {
+    "Price": st.column_config.NumberColumn(format="$%.2f"),
+    "Change %": st.column_config.NumberColumn(format="%+.2f"),
+    "Signal": st.column_config.ProgressColumn(format="%.1f", min_value=0, max_value=10),
+    "Volume (M)": st.column_config.NumberColumn(format="$%.1fM"),
+    "Anomaly": st.column_config.CheckboxColumn(),
+}
+
+def render_scanner_table(snapshot, timeframe, start, stop, positions=None):
+    """نمایش یک صفحه از اسکن به صورت یک جدول واحد"""
+    st.dataframe(
+        snapshot.table(timeframe, start, stop, positions),
+        hide_index=True,
+        use_container_width=True,
+        height=min(36 * (stop - start) + 38, 900),
+        column_config=SCANNER_COLUMN_CONFIG,
+    )
+
+def render_movers_table(frame):
+    """جدول کوچک top-k در صفحه Top Movers"""
+    st.dataframe(
+        frame,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Price": st.column_config.NumberColumn(format="$%.2f"),
+            "Change %": st.column_config.NumberColumn(format="%+.2f"),
+            "Volume (M)": st.column_config.NumberColumn(format="$%.1fM"),
+        },
+    )
+
+def render_pagination(total, key):
+    """کنترل صفحه‌بندی - خروجی بازه (start, stop)"""
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", SCANNER_PAGE_SIZES, key=f"{key}_page_size")
+    page_count = max((total + page_size - 1) // page_size, 1)
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    st.caption(f"Showing {start + 1 if total else 0}-{stop} of {total} (page {page}/{page_count})")
+    return start, stop
 
 # اضافه کردن دکمه دیباگ در جایی از برنامه
 def add_debug_button():
@@ -400,12 +482,38 @@ def add_debug_button():
             st.sidebar.write("📊 First Coin Structure:")
             st.sidebar.json(st.session_state.scan_data['coins'][0])
 
+def profiled_fragment(method):
+    """
+    پروفایل بدنه fragment - rerun جزئی fragment از run() عبور نمی‌کند و trace خودش را می‌گیرد
+    (داخل rerun کامل فقط یک span است)
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not st.session_state.get('profile_reruns'):
+            return method(self, *args, **kwargs)
+        partial = active_trace() is None
+        with st.session_state.profiler.rerun(f"fragment {method.__name__}") as trace:
+            result = method(self, *args, **kwargs)
+        if partial:
+            # پنل نوار کناری در rerun جزئی دوباره رسم نمی‌شود
+            st.caption(f"⏱️ Fragment rerun #{trace.rerun_id}: {trace.duration * 1000:.1f} ms")
+        return result
+    return wrapper
+
 # ==================== MAIN APP ====================
 class VortexAIApp:
     def __init__(self):
-        self.api_client = VortexAPIClient(API_BASE_URL)
-        self.technical_ui = TechnicalAnalysisUI(self.api_client)
+        # کلاینت در session نگه داشته می‌شود تا کش اسکن (ETag/delta) بین rerunها حفظ شود
+        if 'api_client' not in st.session_state:
+            st.session_state.api_client = VortexAPIClient(API_BASE_URL, candle_store=get_candle_store())
+        self.api_client = st.session_state.api_client
+        self.prefetcher = get_technical_prefetcher()
+        self.indicator_book = get_indicator_book()
+        self.technical_ui = TechnicalAnalysisUI(self.api_client, self.prefetcher, self.indicator_book)
 
+    # جستجو و انتخاب کوین فقط پنل تکنیکال را دوباره اجرا می‌کند
+    @st.fragment
+    @profiled_fragment
     def render_technical_analysis(self):
         """صفحه تحلیل تکنیکال پیشرفته"""
         st.markdown("""
@@ -415,24 +523,41 @@ class VortexAIApp:
         """, unsafe_allow_html=True)
     
         if st.session_state.scan_data:
-            coins = st.session_state.scan_data.get("coins", [])
+            coins = self.get_scan_snapshot().coins
         
             if not coins:
                 st.warning("⚠️ No coins data available")
                 return
             
-            # انتخاب کوین برای تحلیل
+            # انتخاب کوین برای تحلیل - جستجو روی ایندکس ساخته شده برای این اسکن
+            index = self.get_scan_snapshot().symbol_index
+            query = st.text_input(
+                "🔎 Search coin by symbol or name",
+                key="tech_coin_search",
+                placeholder="e.g. BTC or bitcoin"
+            )
+            matches = index.search(query, limit=COIN_PICKER_LIMIT)
+            if not matches:
+                st.warning(f"⚠️ No coins match '{query}'")
+                return
+            
             selected_symbol = st.selectbox(
                 "Select Coin for Detailed Analysis",
-                options=[coin['symbol'] for coin in coins],
+                options=[index.symbols[position] for position in matches],
+                format_func=lambda symbol: f"{symbol} — {index.names[index.get(symbol)]}",
                 key="tech_analysis_coin"
             )
         
-            # پیدا کردن کوین انتخاب شده
-            selected_coin = next((coin for coin in coins if coin['symbol'] == selected_symbol), None)
+            cached_count, loading_count = self.prefetcher.status()
+            st.caption(f"⚡ Technical cache: {cached_count} coins ready, {loading_count} loading")
+        
+            # پیدا کردن کوین انتخاب شده - O(1)
+            position = index.get(selected_symbol)
+            selected_coin = coins[position] if position is not None else None
         
             if selected_coin:
-                self.technical_ui.render_technical_dashboard(selected_coin)
+                with span("render_technical_dashboard"):
+                    self.technical_ui.render_technical_dashboard(selected_coin)
             else:
                 st.warning("⚠️ Please select a valid coin")
         else:
@@ -468,32 +593,155 @@ class VortexAIApp:
             st.session_state.last_scan_time = None
         if 'selected_timeframe' not in st.session_state:
             st.session_state.selected_timeframe = "24h"
-        if 'pending_rescan' not in st.session_state:
-            st.session_state.pending_rescan = False
+        if 'scan_snapshot' not in st.session_state:
+            st.session_state.scan_snapshot = None
+        if 'live_version' not in st.session_state:
+            st.session_state.live_version = None
+        if 'profiler' not in st.session_state:
+            st.session_state.profiler = RerunProfiler(capacity=PROFILER_CAPACITY)
+        if 'alert_engine' not in st.session_state:
+            st.session_state.alert_engine = AlertEngine(get_alert_executor(), history=ALERT_HISTORY)
+
+    def get_scan_snapshot(self):
+        """نسخه ستونی اسکن فعلی (ساخت تنبل برای داده‌های قدیمی session)"""
+        if st.session_state.scan_snapshot is None and st.session_state.scan_data:
+            st.session_state.scan_snapshot = ScanSnapshot(
+                st.session_state.scan_data, timeframe=st.session_state.selected_timeframe
+            )
+        return st.session_state.scan_snapshot
+
+    def apply_live_prices(self):
+        """اعمال قیمت‌های زنده استریم روی اسکن فعلی بدون اسکن مجدد"""
+        if not st.session_state.get('live_prices') or not st.session_state.scan_data:
+            return
+        stream = get_price_stream()
+        if stream.version == st.session_state.live_version:
+            return
+        coins, changed = stream.apply_to(st.session_state.scan_data.get('coins', []))
+        if changed:
+            st.session_state.scan_data = {**st.session_state.scan_data, 'coins': coins}
+            # تایم‌فریم اسکن حفظ می‌شود تا switch_timeframe قیمت‌های زنده را با کش جایگزین نکند
+            st.session_state.scan_snapshot = self.get_scan_snapshot().with_scan_data(st.session_state.scan_data)
+            st.session_state.alert_engine.submit(st.session_state.scan_snapshot)
+        st.session_state.live_version = stream.version
 
-    def perform_market_scan(self, timeframe=None):
-        """انجام اسکن مارکت"""
+    def perform_market_scan(self, timeframe=None, limit=None, filter_type=None):
+        """انجام اسکن مارکت - همیشه کل universe؛ محدودیت و مرتب‌سازی نوار کناری محلی اعمال می‌شوند"""
         scan_timeframe = timeframe or st.session_state.selected_timeframe
+        scan_limit = max(SCAN_UNIVERSE_LIMIT, limit or 0, st.session_state.get('scan_limit', 0))
+        if filter_type is None:
+            current = st.session_state.scan_snapshot
+            filter_type = current.filter_type if current is not None else "volume"
+        progress = st.empty()
+        preview = st.empty()
+        received = []
+
+        def show_batch(coins):
+            # ردیف‌های اول اسکن تا رسیدن بقیه پاسخ نمایش داده می‌شوند
+            if len(received) < SCAN_PREVIEW_ROWS:
+                preview.dataframe(
+                    preview_table((received + coins)[:SCAN_PREVIEW_ROWS], scan_timeframe),
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config=SCANNER_COLUMN_CONFIG,
+                )
+            received.extend(coins)
+            progress.caption(f"📥 Received {len(received)} coins...")
+
         with st.spinner(f"🔍 Scanning market ({scan_timeframe})..."):
             scan_result = self.api_client.scan_market(
-                limit=100,
-                filter_type="volume",
-                timeframe=scan_timeframe
+                limit=scan_limit,
+                filter_type=filter_type,
+                timeframe=scan_timeframe,
+                on_batch=show_batch
             )
-            if scan_result and scan_result.get("success"):
-                st.session_state.scan_data = scan_result
+            progress.empty()
+            preview.empty()
+            if scan_result is not None and scan_result is st.session_state.scan_data:
+                # پاسخ 304 - snapshot فعلی همچنان معتبر است
                 st.session_state.last_scan_time = datetime.now().strftime("%H:%M:%S")
-                st.session_state.pending_rescan = False
+            elif scan_result and scan_result.get("success"):
+                self.install_scan(scan_result, scan_timeframe, scan_limit, filter_type)
+                self.record_scan(scan_result)
                 st.success(f"✅ Scan completed! Found {len(scan_result.get('coins', []))} coins ({scan_timeframe})")
             else:
                 st.error("❌ Market scan failed!")
+                return
+            # تایم‌فریم‌های دیگر در پس‌زمینه آماده می‌شوند تا تغییر تایم‌فریم فوری باشد
+            scan_cache = get_scan_cache()
+            scan_cache.put(scan_timeframe, scan_limit, filter_type, scan_result)
+            scan_cache.warm(
+                [tf for tf in SCAN_CACHE_TTLS if tf != scan_timeframe], scan_limit, filter_type
+            )
 
+    def install_scan(self, scan_result, timeframe, limit, filter_type, fetched_at=None):
+        """جایگزینی اسکن فعلی session با یک نتیجه جدید (از سرور، یا از کش تایم‌فریم با fetched_at)"""
+        # session فقط ارجاع به اسکن و snapshot مشترک (فقط خواندنی) نگه می‌دارد
+        st.session_state.scan_data = scan_result
+        st.session_state.scan_snapshot = shared_cache.derive(
+            scan_result,
+            ("snapshot", limit, filter_type, timeframe),
+            lambda: ScanSnapshot(scan_result, limit=limit, filter_type=filter_type, timeframe=timeframe)
+        )
+        st.session_state.live_version = None
+        snapshot = st.session_state.scan_snapshot
+        # هر پاسخ (مشترک بین sessionها) فقط یک بار به اندیکاتورها داده می‌شود
+        shared_cache.derive(
+            scan_result, "indicators",
+            lambda: self.indicator_book.ingest_scan(snapshot.coins, scan_timestamp(scan_result))
+        )
+        if fetched_at is None:
+            # اسکن کش‌شده تایم‌فریم داده جدیدی نیست - هشدارها فقط با اسکن تازه
+            st.session_state.alert_engine.submit(snapshot)
+        scanned_at = datetime.fromtimestamp(fetched_at) if fetched_at else datetime.now()
+        st.session_state.last_scan_time = scanned_at.strftime("%H:%M:%S")
+        # گرم کردن کش در پس‌زمینه - در حالت local کندل‌های تاریخچه، در غیر این صورت تحلیل تکنیکال سرور
+        if TECHNICAL_INDICATOR_SOURCE == "local":
+            self.prefetcher.warm_history(
+                [coin.symbol for coin in snapshot.coins[:HISTORY_PREFETCH_TOP_N]], TECHNICAL_HISTORY_TIMEFRAME
+            )
+        else:
+            self.prefetcher.warm([coin.symbol for coin in snapshot.coins[:TECHNICAL_PREFETCH_TOP_N]])
+
+    def record_scan(self, scan_result):
+        """افزودن اسکن به تاریخچه دیسک - هر پاسخ (مشترک بین sessionها) فقط یک بار ثبت می‌شود"""
+        snapshot = st.session_state.scan_snapshot
+        shared_cache.derive(
+            scan_result,
+            "recorded",
+            lambda: get_scan_recorder().record(snapshot.coins, scan_timestamp(scan_result))
+        )
+
+    def switch_timeframe(self, timeframe):
+        """تغییر تایم‌فریم از کش (بدون انتظار شبکه) - فقط در صورت نبود کش اسکن جدید زده می‌شود"""
+        snapshot = self.get_scan_snapshot()
+        if snapshot is None or snapshot.timeframe == timeframe:
+            return
+        scan_cache = get_scan_cache()
+        limit = snapshot.limit or SCAN_UNIVERSE_LIMIT
+        cached, fetched_at, fresh = scan_cache.get(timeframe, limit, snapshot.filter_type)
+        if cached is None:
+            self.perform_market_scan(timeframe=timeframe, limit=limit, filter_type=snapshot.filter_type)
+        else:
+            self.install_scan(cached, timeframe, limit, snapshot.filter_type, fetched_at)
+            if not fresh:
+                # داده کهنه فوراً نمایش داده می‌شود و نسخه تازه در پس‌زمینه دریافت می‌شود
+                scan_cache.warm([timeframe], limit, snapshot.filter_type)
+        # کارت Last Scan بالای صفحه قبل از اسکنر رسم شده - با نصب اسکن جدید rerun کامل
+        # (اگر اسکن ناموفق بود rerun نمی‌شود تا حلقه ایجاد نشود)
+        if self.get_scan_snapshot().timeframe == timeframe:
+            st.rerun()
+
+    # بخش مستقل: هر HEALTH_POLL_INTERVAL ثانیه فقط همین بخش از کش سلامت به‌روز می‌شود
+    @st.fragment(run_every=HEALTH_POLL_INTERVAL)
+    @profiled_fragment
     def render_status_cards(self):
         """کارت های وضعیت"""
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            health = self.api_client.get_health_status()
+            # فقط خواندن از کش - درخواست شبکه در thread پس‌زمینه انجام می‌شود
+            health, age = get_health_monitor().get_snapshot()
             status_color = "🟢" if health.get('status') == 'healthy' else "🔴"
             st.markdown(f"""
             <div class="glass-card" style="text-align: center;">
@@ -501,6 +749,9 @@ class VortexAIApp:
                 <div class="text-primary" style="font-size: 1.2rem; font-weight: bold;">
                     {status_color} {health.get('status','Unknown').title()}
                 </div>
+                <div class="text-secondary" style="font-size: 0.8rem; margin-top: 0.3rem;">
+                    {format_age(age)}
+                </div>
             </div>
             """, unsafe_allow_html=True)
         
@@ -523,6 +774,8 @@ class VortexAIApp:
         with col3:
             if st.button("🔄 Scan Market", use_container_width=True, type="primary"):
                 self.perform_market_scan()
+                # اسکن جدید روی همه بخش‌ها اثر دارد - rerun کامل
+                st.rerun()
 
     def render_sidebar(self):
         """نوار کناری"""
@@ -550,44 +803,241 @@ class VortexAIApp:
             </div>
             """, unsafe_allow_html=True)
             
-            scan_limit = st.slider("Number of coins", 10, 200, 100)
-            filter_type = st.selectbox("Filter by", ["volume", "momentum_1h", "momentum_4h", "ai_signal"])
+            # تغییر این دو فقط روی اسکن کش‌شده اعمال می‌شود (بدون درخواست جدید)
+            scan_limit = st.slider("Number of coins", 10, SCAN_UNIVERSE_LIMIT, 100, key="scan_limit")
+            filter_type = st.selectbox("Filter by", list(SCAN_SORT_FIELDS), key="scan_filter")
             
             if st.button("💡 Start Real Scan", use_container_width=True):
                 self.perform_market_scan()
             
+            # قیمت‌های زنده از استریم سرور (اتصال مشترک بین همه sessionها)
+            if st.toggle("📡 Live prices", key="live_prices"):
+                stream = get_price_stream()
+                stream.start()
+                state = "🟢 Connected" if stream.connected else "🟡 Reconnecting"
+                st.caption(f"{state} · {stream.tick_count} ticks · {stream.reconnects} reconnects")
+            
             return page, scan_limit, filter_type
 
+    # تایم‌فریم، نمای جدول/کارت و صفحه‌بندی فقط همین بخش را دوباره اجرا می‌کنند
+    @st.fragment
+    @profiled_fragment
     def render_market_scanner(self, scan_limit, filter_type):
         """اسکنر مارکت"""
+        self.market_scanner_body(scan_limit, filter_type)
+
+    # با قیمت‌های زنده، اسکنر بدون rerun کامل هر LIVE_REFRESH_INTERVAL ثانیه به‌روز می‌شود
+    @st.fragment(run_every=LIVE_REFRESH_INTERVAL)
+    @profiled_fragment
+    def render_live_market_scanner(self, scan_limit, filter_type):
+        """اسکنر مارکت با اعمال دوره‌ای قیمت‌های زنده"""
+        self.apply_live_prices()
+        self.market_scanner_body(scan_limit, filter_type)
+
+    def market_scanner_body(self, scan_limit, filter_type):
+        """محتوای اسکنر مشترک بین دو fragment"""
         st.markdown("""
         <div class="glass-card">
             <h2 style="color: #FFFFFF; margin: 0;">🔍 Market Scanner</h2>
         </div>
         """, unsafe_allow_html=True)
 
-        # اگر تایم‌فریم تغییر کرد، اسکن جدید بزن
-        if st.session_state.pending_rescan:
-            self.perform_market_scan()
-
         # نمایش وضعیت داده‌ها
         if st.session_state.scan_data:
-            coins = st.session_state.scan_data.get("coins", [])
+            # نمایش انتخاب تایم‌فریم - تایم‌فریم‌های پیش‌واکشی شده از کش نمایش داده می‌شوند
+            render_timeframe_selector()
+            self.switch_timeframe(st.session_state.selected_timeframe)
+
+            # فقط وقتی اسکن کش‌شده برای limit/sort درخواستی کافی نیست سراغ سرور می‌رویم
+            snapshot = self.get_scan_snapshot()
+            if not snapshot.can_answer(scan_limit, filter_type):
+                sort_field = SCAN_SORT_FIELDS.get(filter_type, "volume")
+                fetch_filter = snapshot.filter_type if snapshot.frame[sort_field].notna().any() else filter_type
+                self.perform_market_scan(limit=scan_limit, filter_type=fetch_filter)
+                snapshot = self.get_scan_snapshot()
+
+            coins = snapshot.coins
+            positions = snapshot.query(scan_limit, filter_type)
             current_tf = st.session_state.selected_timeframe
             display_map = {"1h": "1H", "4h": "4H", "24h": "1D", "7d": "1W", "30d": "1M", "90d": "3M"}
-            st.success(f"📊 Displaying {len(coins)} coins ({display_map.get(current_tf, current_tf)})")
+            st.success(
+                f"📊 Displaying top {len(positions)} of {len(coins)} coins by {filter_type} "
+                f"({display_map.get(current_tf, current_tf)})"
+            )
 
-            # نمایش انتخاب تایم‌فریم
-            render_timeframe_selector()
+            view_mode = st.radio(
+                "View",
+                ["📋 Table", "🃏 Cards"],
+                horizontal=True,
+                key="scanner_view_mode"
+            )
+            start, stop = render_pagination(len(positions), "scanner")
 
-            # نمایش کوین‌ها در یک کارت شیشه‌ای
-            st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
-            for coin in coins:
-                render_coin_card_clean(coin)
-            st.markdown('</div>', unsafe_allow_html=True)
+            if view_mode == "📋 Table":
+                # کل صفحه در یک المان - حجم ارسال مستقل از تعداد کوین‌ها
+                render_scanner_table(snapshot, current_tf, start, stop, positions)
+            else:
+                # نمایش کوین‌ها در یک کارت شیشه‌ای
+                st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+                for position in positions[start:stop]:
+                    render_coin_card_clean(coins[position])
+                st.markdown('</div>', unsafe_allow_html=True)
         else:
             st.warning("⚠️ No market data available. Click 'Scan Market' to get real-time data.")
 
+    def render_settings(self):
+        """تنظیمات و پنل عیب‌یابی"""
+        st.markdown("""
+        <div class="glass-card">
+            <h2 style="color: #FFFFFF; margin: 0;">⚙️ Settings & Diagnostics</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+        endpoint_rows = metrics_registry.endpoint_rows()
+        policy_state = self.api_client.policy.state()
+        for row in endpoint_rows:
+            state = policy_state.get(row['endpoint'], {})
+            row['timeout s'] = round(state['timeout'], 1) if state.get('timeout') else None
+            row['circuit'] = state.get('circuit', 'closed')
+
+        st.markdown("#### 📡 Upstream endpoints")
+        if endpoint_rows:
+            st.dataframe(endpoint_rows, hide_index=True, use_container_width=True)
+        else:
+            st.info("No upstream requests recorded yet")
+
+        st.markdown("#### 🚦 Request scheduler")
+        scheduler_rows = self.api_client.scheduler.rows()
+        if scheduler_rows:
+            st.dataframe(scheduler_rows, hide_index=True, use_container_width=True)
+        else:
+            st.info("No requests scheduled yet")
+
+        st.markdown("#### 🗃️ Cache hit ratios")
+        cache_rows = metrics_registry.cache_rows()
+        if cache_rows:
+            st.dataframe(cache_rows, hide_index=True, use_container_width=True)
+        else:
+            st.info("No cache lookups recorded yet")
+
+        entries, in_flight, coalesced = shared_cache.status()
+        st.caption(
+            f"Shared response cache: {entries} entries · {in_flight} in flight · "
+            f"{coalesced} duplicate requests coalesced"
+        )
+        scans, rows, symbols, size = get_scan_recorder().status()
+        st.caption(
+            f"Scan recorder: {scans} scans · {rows} rows · {symbols} symbols · "
+            f"{size / 1_000_000:.1f} MB on disk"
+        )
+
+        if st.button("🧹 Reset metrics"):
+            metrics_registry.reset()
+            st.rerun()
+
+    def render_top_movers(self):
+        """بیشترین رشد، افت و حجم - انتخاب‌ها فقط از top-k محاسبه شده در snapshot می‌خوانند"""
+        st.markdown("""
+        <div class="glass-card">
+            <h2 style="color: #FFFFFF; margin: 0;">🚀 Top Movers</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+        snapshot = self.get_scan_snapshot()
+        if snapshot is None or not len(snapshot):
+            st.warning("⚠️ Scan market first to see top movers")
+            return
+
+        labels = {"1h": "1H", "24h": "1D", "7d": "1W"}
+        col1, col2 = st.columns(2)
+        with col1:
+            timeframe = st.radio(
+                "Timeframe",
+                list(TIMEFRAME_CHANGE_FIELDS),
+                format_func=labels.get,
+                index=list(TIMEFRAME_CHANGE_FIELDS).index("24h"),
+                horizontal=True,
+                key="movers_timeframe"
+            )
+        with col2:
+            k = st.select_slider(
+                "Show top",
+                [option for option in TOP_MOVERS_K_OPTIONS if option <= snapshot.top_k],
+                value=min(10, snapshot.top_k),
+                key="movers_k"
+            )
+
+        gainers, losers, volume = st.tabs(["📈 Gainers", "📉 Losers", "💰 Volume leaders"])
+        with gainers:
+            render_movers_table(snapshot.movers_table("gainers", timeframe, k))
+        with losers:
+            render_movers_table(snapshot.movers_table("losers", timeframe, k))
+        with volume:
+            render_movers_table(snapshot.movers_table("volume", timeframe, k))
+
+    def render_alerts(self):
+        """قوانین هشدار و هشدارهای اخیر - ارزیابی در worker پس‌زمینه انجام می‌شود"""
+        st.markdown("""
+        <div class="glass-card">
+            <h2 style="color: #FFFFFF; margin: 0;">⚠️ Alerts</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+        engine = st.session_state.alert_engine
+        with st.form("alert_rule_form", clear_on_submit=True):
+            col1, col2, col3, col4 = st.columns([3, 1, 2, 2])
+            with col1:
+                field = st.selectbox("Field", list(RULE_FIELDS), format_func=lambda f: RULE_FIELDS[f][0])
+            with col2:
+                op = st.selectbox("Condition", list(RULE_OPERATORS))
+            with col3:
+                threshold = st.number_input("Threshold", value=5.0, help="Ignored for volume anomaly")
+            with col4:
+                cooldown = st.number_input(
+                    "Cooldown (min)", min_value=0, value=ALERT_DEFAULT_COOLDOWN // 60, step=5
+                )
+            if st.form_submit_button("➕ Add rule"):
+                engine.add_rule(AlertRule(field, op, threshold, cooldown * 60))
+                # ارزیابی فوری قانون جدید روی اسکن فعلی
+                engine.submit(self.get_scan_snapshot())
+
+        rules = engine.rules()
+        if rules:
+            st.markdown("#### 📏 Rules")
+            for rule in rules:
+                col1, col2 = st.columns([5, 1])
+                with col1:
+                    st.markdown(f"`{rule.rule_id}` {rule.describe()} · cooldown {rule.cooldown // 60:.0f} min")
+                with col2:
+                    if st.button("🗑️", key=f"remove_{rule.rule_id}"):
+                        engine.remove_rule(rule.rule_id)
+                        st.rerun()
+        else:
+            st.info("No alert rules yet - add one above")
+
+        self.render_recent_alerts()
+
+    # هشدارهای worker پس‌زمینه بدون rerun کامل هر ALERT_REFRESH_INTERVAL ثانیه نمایش داده می‌شوند
+    @st.fragment(run_every=ALERT_REFRESH_INTERVAL)
+    @profiled_fragment
+    def render_recent_alerts(self):
+        """هشدارهای اخیر و وضعیت آخرین ارزیابی"""
+        engine = st.session_state.alert_engine
+        st.markdown("#### 🔔 Recent alerts")
+        if engine.last_error:
+            st.error(f"❌ Alert evaluation failed: {engine.last_error}")
+        if engine.evaluated_scan:
+            st.caption(f"Last evaluated {engine.evaluated_scan} · {engine.evaluated_rows} changed coins checked")
+        alerts = engine.recent()
+        if alerts:
+            if st.button("🧹 Clear alerts"):
+                engine.clear()
+                st.rerun(scope="fragment")
+            for alert in alerts:
+                render_alert_card(alert, LIGHT_THEME)
+        else:
+            st.caption("No alerts triggered yet")
+
     def render_dashboard(self):
         """داشبورد اصلی"""
         st.markdown("""
@@ -596,25 +1046,22 @@ class VortexAIApp:
         </div>
         """, unsafe_allow_html=True)
 
-        if st.session_state.scan_data:
-            coins = st.session_state.scan_data.get("coins", [])
+        snapshot = self.get_scan_snapshot()
+        if snapshot is not None:
+            stats = snapshot.aggregates()
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                render_metric_card("Total Coins", len(coins))
+                render_metric_card("Total Coins", stats['total'])
             
             with col2:
-                strong_signals = len([c for c in coins if c.get('VortexAI_analysis', {}).get('signal_strength', 0) > 7])
-                render_metric_card("Strong Signals", strong_signals)
+                render_metric_card("Strong Signals", stats['strong_signals'])
             
             with col3:
-                anomalies = len([c for c in coins if c.get('VortexAI_analysis', {}).get('volume_anomaly', False)])
-                render_metric_card("Volume Anomalies", anomalies)
+                render_metric_card("Volume Anomalies", stats['anomalies'])
             
             with col4:
-                # محاسبه میانگین تغییرات 24h - اصلاح شده
-                total_change = sum([c.get('change_24h', 0) for c in coins])
-                avg_change = total_change / max(len(coins), 1)
+                avg_change = stats['avg_change_1d']
                 render_metric_card("Avg 24h Change", f"{avg_change:+.2f}%", avg_change)
         else:
             st.warning("⚠️ Scan market first to see dashboard data")
@@ -627,56 +1074,69 @@ class VortexAIApp:
             st.rerun()
     
         self.initialize_session_state()
-        apply_glass_design()
-        render_glass_header()
-    
-        # 🔍 دیباگ پیشرفته
-        st.sidebar.write("---")
-        st.sidebar.write("🔧 DEBUG INFO:")
-        st.sidebar.write(f"Scan Data: {st.session_state.scan_data is not None}")
-    
-        page, scan_limit, filter_type = self.render_sidebar()
-    
-        st.sidebar.write(f"Selected Page: '{page}'")
     
-        # شرط ساده و مستقیم
-        if page == "📊 Dashboard":
-            self.render_dashboard()
-        elif page == "🔍 Market Scanner":
-            self.render_market_scanner(scan_limit, filter_type)
-        elif "Technical" in page or "📈" in page:  # 🔥 هر چیزی که تکنیکال داره
-            self.render_technical_analysis()
-        elif page == "🚀 Top Movers":
-            st.info("🚀 Top movers page - Coming soon")
-        elif page == "⚠️ Alerts":
-            st.info("⚠️ Alerts page - Coming soon")
-        elif page == "⚙️ Settings":
-            st.info("⚙️ Settings page")
+        # پروفایل اختیاری rerun - فازهای رندر و درخواست‌های API به صورت span ثبت می‌شوند
+        if st.session_state.get('profile_reruns'):
+            with st.session_state.profiler.rerun():
+                self.render_app()
         else:
-            st.error(f"❌ Unknown page: {page}")
+            self.render_app()
+        self.render_profiler_panel()
 
+    def render_app(self):
+        """فازهای رندر یک rerun"""
+        with span("apply_glass_design"):
+            apply_glass_design()
+        with span("render_glass_header"):
+            render_glass_header()
+        with span("render_status_cards"):
+            self.render_status_cards()
+    
+        with span("render_sidebar"):
+            page, scan_limit, filter_type = self.render_sidebar()
+        with span("apply_live_prices"):
+            self.apply_live_prices()
+    
+        with span(f"page {page}"):
+            if page == "📊 Dashboard":
+                self.render_dashboard()
+            elif page == "🔍 Market Scanner":
+                if st.session_state.get('live_prices'):
+                    self.render_live_market_scanner(scan_limit, filter_type)
+                else:
+                    self.render_market_scanner(scan_limit, filter_type)
+            elif "Technical" in page or "📈" in page:  # 🔥 هر چیزی که تکنیکال داره
+                self.render_technical_analysis()
+            elif page == "🚀 Top Movers":
+                self.render_top_movers()
+            elif page == "⚠️ Alerts":
+                self.render_alerts()
+            elif page == "⚙️ Settings":
+                self.render_settings()
+            else:
+                st.error(f"❌ Unknown page: {page}")
 
-    # 🔥 این رو به انتهای app.py اضافه کن (قبل از خط آخر)
-def add_technical_method():
-    """اضافه کردن تابع get_coin_technical به VortexAPIClient"""
-    def get_coin_technical(self, symbol):
-        try:
-            response = self.session.get(
-                f"{self.base_url}/coin/{symbol}/technical",
-                timeout=self.timeout
+    def render_profiler_panel(self):
+        """پنل پروفایلر در نوار کناری (جایگزین خروجی دیباگ)"""
+        with st.sidebar:
+            st.divider()
+            if not st.toggle("⏱️ Profile reruns", key="profile_reruns"):
+                return
+            profiler = st.session_state.profiler
+            trace = profiler.last()
+            if trace is None:
+                st.caption("Interact with the app to record a rerun")
+                return
+            st.caption(f"Rerun #{trace.rerun_id}: {trace.duration * 1000:.1f} ms · {len(profiler.reruns)} kept")
+            st.dataframe(profiler.phase_rows(trace), hide_index=True, use_container_width=True)
+            st.download_button(
+                "⬇️ Chrome trace",
+                profiler.chrome_trace(),
+                file_name="vortex-reruns.trace.json",
+                mime="application/json",
+                use_container_width=True
             )
-            self.request_count += 1
-            data = response.json()
-            return data if data.get("success") else None
-        except Exception as e:
-            st.error(f"🔧 Technical analysis error: {str(e)}")
-            return None
-    
-    # اضافه کردن تابع به کلاس
-    VortexAPIClient.get_coin_technical = get_coin_technical
 
-# فراخوانی تابع برای اضافه کردن متد
-add_technical_method()
 if __name__ == "__main__":
     app = VortexAIApp()
     app.run()
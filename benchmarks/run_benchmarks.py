@@ -0,0 +1,205 @@
+"""
+بنچمارک end-to-end اپلیکیشن روی سرور mock محلی
+
+    python benchmarks/run_benchmarks.py                       # اجرا و مقایسه با baseline
+    python benchmarks/run_benchmarks.py --save-baseline       # ذخیره نتیجه به عنوان baseline
+    python benchmarks/run_benchmarks.py --coins 10 100 --latency 0.05
+
+برای هر تعداد کوین و هر صفحه: زمان rerun، تعداد المان‌های Streamlit،
+پیک حافظه (tracemalloc) و تعداد درخواست‌های ارسالی به سرور ثبت می‌شود.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+LATEST_PATH = os.path.join(RESULTS_DIR, "latest.json")
+
+PAGES = [
+    "📊 Dashboard",
+    "🔍 Market Scanner",
+    "📈 Technical Data",
+    "🚀 Top Movers",
+    "⚠️ Alerts",
+    "⚙️ Settings",
+]
+
+SCAN_ENDPOINT = "/api/scan/vortexai"
+# پایشگر سلامت با تایمر خودش درخواست می‌فرستد - در شمارش درخواست‌های هر صفحه حساب نمی‌شود
+HEALTH_ENDPOINT = "/api/health-combined"
+
+# آستانه‌های تشخیص پسرفت نسبت به baseline
+WALL_TIME_TOLERANCE = 0.25
+WALL_TIME_MIN_DELTA_MS = 20
+ELEMENT_TOLERANCE = 0.10
+MEMORY_TOLERANCE = 0.20
+MEMORY_MIN_DELTA_MB = 5
+
+
+def count_elements(node):
+    """تعداد کل المان‌ها و بلاک‌های درخت خروجی AppTest"""
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def wait_for_quiet(counter, quiet=0.3, limit=30.0):
+    """صبر تا پایان درخواست‌های پس‌زمینه (مثل prefetch) تا شمارش درخواست‌ها قطعی باشد"""
+    deadline = time.time() + limit
+    last = sum(counter.values())
+    while time.time() < deadline:
+        time.sleep(quiet)
+        current = sum(counter.values())
+        if current == last:
+            return
+        last = current
+
+
+def measure(app_test, counter, action, track_memory):
+    before = dict(counter)
+    if track_memory:
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    action()
+    wall_ms = (time.perf_counter() - started) * 1000
+    peak_mb = tracemalloc.get_traced_memory()[1] / 2**20 if track_memory else None
+    if app_test.exception:
+        raise RuntimeError(f"app raised: {app_test.exception[0].value}")
+    wait_for_quiet(counter)
+    by_endpoint = {
+        endpoint: count - before.get(endpoint, 0)
+        for endpoint, count in counter.items()
+        if count - before.get(endpoint, 0)
+    }
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "elements": count_elements(app_test._tree),
+        "peak_mb": round(peak_mb, 2) if peak_mb is not None else None,
+        "upstream_requests": sum(count for endpoint, count in by_endpoint.items() if endpoint != HEALTH_ENDPOINT),
+        "requests_by_endpoint": by_endpoint,
+    }
+
+
+def run_suite(coin_counts, latency, timeout, track_memory):
+    from streamlit.testing.v1 import AppTest
+    import streamlit as st
+    from tools.mock_upstream import start_in_thread
+
+    server, base_url = start_in_thread(coin_count=coin_counts[0], latency=latency, honor_limit=False)
+    os.environ["VORTEX_API_BASE_URL"] = base_url
+    os.environ.setdefault("VORTEX_CANDLE_DIR", tempfile.mkdtemp(prefix="vortex-bench-"))
+    os.environ.setdefault("VORTEX_SCAN_DIR", tempfile.mkdtemp(prefix="vortex-bench-scans-"))
+    # config.constants آدرس سرور و مسیرها را هنگام import می‌خواند - فقط بعد از تنظیم env
+    from modules.shared_cache import shared_cache
+    handler = server.RequestHandlerClass
+    if track_memory:
+        tracemalloc.start()
+
+    results = []
+    try:
+        for coin_count in coin_counts:
+            handler.market.resize(coin_count)
+            st.cache_resource.clear()
+            st.cache_data.clear()
+            shared_cache.clear()
+
+            app_test = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+            cases = [("initial", lambda: app_test.run())]
+            cases.append(("scan", lambda: next(
+                button for button in app_test.button if "Scan Market" in (button.label or "")
+            ).click().run()))
+            for page in PAGES:
+                cases.append((page, lambda page=page: app_test.radio(key="main_navigation_v2").set_value(page).run()))
+
+            for name, action in cases:
+                row = {"coins": coin_count, "page": name}
+                row.update(measure(app_test, handler.counter, action, track_memory))
+                results.append(row)
+                if name == "scan" and not row["requests_by_endpoint"].get(SCAN_ENDPOINT):
+                    raise RuntimeError("scan case sent no requests to the mock upstream - "
+                                       "the app is not using the benchmark server")
+                print(f"{coin_count:>6} coins  {name:<20} {row['wall_ms']:>9.1f} ms  "
+                      f"{row['elements']:>6} elements  {row['upstream_requests']:>4} requests"
+                      + (f"  {row['peak_mb']:>8.2f} MB" if row['peak_mb'] is not None else ""))
+    finally:
+        server.shutdown()
+    return results
+
+
+def find_regressions(results, baseline):
+    """مقایسه با baseline - خروجی لیست پیام‌های پسرفت"""
+    previous = {(row["coins"], row["page"]): row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        old = previous.get((row["coins"], row["page"]))
+        if old is None:
+            continue
+        label = f"{row['coins']} coins / {row['page']}"
+        if (row["wall_ms"] > old["wall_ms"] * (1 + WALL_TIME_TOLERANCE)
+                and row["wall_ms"] - old["wall_ms"] > WALL_TIME_MIN_DELTA_MS):
+            regressions.append(f"{label}: wall time {old['wall_ms']} -> {row['wall_ms']} ms")
+        if row["elements"] > old["elements"] * (1 + ELEMENT_TOLERANCE):
+            regressions.append(f"{label}: elements {old['elements']} -> {row['elements']}")
+        # بدون --no-memory در هر دو اجرا peak_mb قابل مقایسه است
+        if (row["peak_mb"] is not None and old.get("peak_mb") is not None
+                and row["peak_mb"] > old["peak_mb"] * (1 + MEMORY_TOLERANCE)
+                and row["peak_mb"] - old["peak_mb"] > MEMORY_MIN_DELTA_MB):
+            regressions.append(f"{label}: peak memory {old['peak_mb']} -> {row['peak_mb']} MB")
+        if row["upstream_requests"] > old["upstream_requests"]:
+            regressions.append(f"{label}: upstream requests {old['upstream_requests']} -> {row['upstream_requests']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VortexAI end-to-end benchmarks")
+    parser.add_argument("--coins", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--latency", type=float, default=0.0, help="mock upstream latency in seconds")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no peak memory)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    results = run_suite(args.coins, args.latency, args.timeout, not args.no_memory)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "latency": args.latency,
+            "memory_tracked": not args.no_memory,
+        },
+        "results": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(LATEST_PATH, "w") as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print(f"\nNo baseline at {BASELINE_PATH} - run with --save-baseline first")
+        return 1
+    with open(BASELINE_PATH) as handle:
+        regressions = find_regressions(results, json.load(handle))
+    if regressions:
+        print("\nRegressions against baseline:")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,14 @@
 import streamlit as st
+from modules.fragment_cache import fragments, theme_key
 
 def render_metric_card(title, value, change, theme):
     """کارت متریک"""
+    st.html(fragments.render(
+        "cards_metric", (title, value, change, theme_key(theme)),
+        lambda: _metric_card_html(title, value, change, theme)
+    ))
+
+def _metric_card_html(title, value, change, theme):
     change_html = ""
     if change:
         change_color = theme['success'] if change.startswith('+') else theme['error']
@@ -14,10 +21,17 @@ def render_metric_card(title, value, change, theme):
         {change_html}
     </div>
     """
-    st.html(html_content)
+    return html_content
 
 def render_coin_card(coin, theme):
     """کارت نمایش کوین"""
+    key = (
+        coin['symbol'], coin['name'], coin['price'], coin['change_24h'],
+        coin['signal'], coin['volume'], bool(coin['anomaly']), theme_key(theme)
+    )
+    st.html(fragments.render("cards_coin", key, lambda: _coin_card_html(coin, theme)))
+
+def _coin_card_html(coin, theme):
     change_color = theme['success'] if coin['change_24h'] >= 0 else theme['error']
     change_icon = "📈" if coin['change_24h'] >= 0 else "📉"
     
@@ -70,7 +84,7 @@ def render_coin_card(coin, theme):
         </div>
     </div>
     """
-    st.html(html_content)
+    return html_content
 
 def render_alert_card(alert, theme):
     """کارت هشدار"""
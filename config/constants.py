@@ -1,3 +1,5 @@
+import os
+
 # تم روشن - طراحی شیشه‌ای
 LIGHT_THEME = {
     "primary": "#2563EB",
@@ -31,4 +33,86 @@ DARK_THEME = {
 }
 
 # آدرس سرور واقعی شما
-API_BASE_URL = "https://server-test-ovta.onrender.com/api"
+API_BASE_URL = os.getenv("VORTEX_API_BASE_URL", "https://server-test-ovta.onrender.com/api")
+
+# پایش سلامت سرور (ثانیه)
+HEALTH_POLL_INTERVAL = 15
+HEALTH_CACHE_TTL = 60
+
+# پیش‌واکشی تحلیل تکنیکال
+TECHNICAL_PREFETCH_TOP_N = 200
+HISTORY_PREFETCH_TOP_N = 50  # حالت local: تاریخچه حجیم‌تر از پاسخ technical است
+TECHNICAL_PREFETCH_WORKERS = 8
+TECHNICAL_CACHE_TTL = 300
+
+# صفحه‌بندی اسکنر
+SCANNER_PAGE_SIZES = [25, 50, 100]
+
+# منبع اندیکاتورها: "local" (محاسبه از تاریخچه قیمت) یا "server"
+TECHNICAL_INDICATOR_SOURCE = "local"
+TECHNICAL_HISTORY_TIMEFRAME = "7d"
+
+# استریم قیمت زنده
+LIVE_STREAM_PATH = "/stream/prices"
+LIVE_REFRESH_INTERVAL = 2  # ثانیه - بازه اعمال قیمت‌های زنده روی اسکنر
+
+# کش دائمی کندل‌ها روی دیسک
+CANDLE_STORE_DIR = os.getenv("VORTEX_CANDLE_DIR", os.path.join(".vortex_cache", "candles"))
+
+# ثبت ستونی همه اسکن‌ها روی دیسک (قیمت، حجم و قدرت سیگنال هر کوین در هر اسکن)
+SCAN_RECORDER_DIR = os.getenv("VORTEX_SCAN_DIR", os.path.join(".vortex_cache", "scans"))
+
+# تعداد rerunهای نگه داشته شده در پروفایلر
+PROFILER_CAPACITY = 20
+
+# حداکثر گزینه‌های انتخاب کوین در صفحه تکنیکال
+COIN_PICKER_LIMIT = 50
+
+# صفحه Top Movers - تعداد انتخاب‌ها محاسبه یک باره top-k برای هر اسکن را تغییر نمی‌دهد
+TOP_MOVERS_MAX_K = 50
+TOP_MOVERS_K_OPTIONS = [5, 10, 20, 50]
+
+# موتور هشدار
+ALERT_HISTORY = 200
+ALERT_DEFAULT_COOLDOWN = 900
+ALERT_WORKERS = 2
+ALERT_REFRESH_INTERVAL = 5  # ثانیه - بازه به‌روزرسانی لیست هشدارهای اخیر
+
+# اسکن کل بازار یک بار با این تعداد - محدودیت/مرتب‌سازی نوار کناری به صورت محلی اعمال می‌شود
+SCAN_UNIVERSE_LIMIT = 200
+
+# کش اسکن برای هر تایم‌فریم (TTL به ثانیه) - تایم‌فریم‌های دیگر در پس‌زمینه پیش‌واکشی می‌شوند
+SCAN_CACHE_TTLS = {
+    "1h": 60,
+    "4h": 180,
+    "24h": 300,
+    "7d": 900,
+    "30d": 1800,
+    "90d": 3600,
+}
+SCAN_PREFETCH_WORKERS = 3
+
+# کش LRU قطعه‌های HTML کارت‌ها
+FRAGMENT_CACHE_SIZE = 4096
+
+# کش پاسخ‌های مشترک بین sessionها (TTL به ثانیه) با ادغام درخواست‌های همزمان
+SHARED_CACHE_TTLS = {
+    "scan": 15,
+    "technical": 60,
+    "history": 60,
+}
+SHARED_CACHE_SIZE = 1024
+
+# محدودیت نرخ درخواست به سرور برای هر endpoint: (درخواست در ثانیه، ظرفیت burst)
+SCHEDULER_RATES = {
+    "scan": (2.0, 6),
+    "technical": (10.0, 20),
+    "history": (10.0, 20),
+    "health": (1.0, 2),
+}
+SCHEDULER_DEFAULT_RATE = (5.0, 10)
+
+# دریافت جریانی اسکن: اندازه chunk خواندن (بایت)، تعداد کوین هر بسته و ردیف‌های پیش‌نمایش
+SCAN_STREAM_CHUNK = 64 * 1024
+SCAN_STREAM_BATCH = 50
+SCAN_PREVIEW_ROWS = 20
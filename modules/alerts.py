@@ -0,0 +1,187 @@
+import itertools
+import operator
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+# فیلدهای قابل استفاده در قوانین: (برچسب نمایشی، نوع کارت هشدار)
+RULE_FIELDS = {
+    "priceChange1h": ("Price change 1H %", "price"),
+    "priceChange1d": ("Price change 1D %", "price"),
+    "priceChange1w": ("Price change 1W %", "price"),
+    "volume": ("Volume $", "volume"),
+    "signal_strength": ("Signal strength", "signal"),
+    "volume_anomaly": ("Volume anomaly", "volume"),
+}
+
+RULE_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+_rule_ids = itertools.count(1)
+
+
+class AlertRule:
+    """قانون آستانه روی یک فیلد اسکن"""
+
+    def __init__(self, field, op=">", threshold=0.0, cooldown=900, rule_id=None):
+        if field not in RULE_FIELDS:
+            raise ValueError(f"unknown alert field: {field}")
+        if field != "volume_anomaly" and op not in RULE_OPERATORS:
+            raise ValueError(f"unknown alert operator: {op}")
+        self.rule_id = rule_id or f"rule-{next(_rule_ids)}"
+        self.field = field
+        self.op = op
+        self.threshold = float(threshold)
+        self.cooldown = cooldown
+
+    @property
+    def alert_type(self):
+        return RULE_FIELDS[self.field][1]
+
+    def describe(self):
+        label = RULE_FIELDS[self.field][0]
+        if self.field == "volume_anomaly":
+            return f"{label} detected"
+        return f"{label} {self.op} {self.threshold:g}"
+
+    def compile(self):
+        """تبدیل قانون به predicate برداری روی آرایه ستون"""
+        if self.field == "volume_anomaly":
+            return lambda values: values.astype(bool)
+        compare, threshold = RULE_OPERATORS[self.op], self.threshold
+        return lambda values: compare(values, threshold)
+
+
+class AlertEngine:
+    """ارزیابی پس‌زمینه قوانین هشدار فقط روی کوین‌هایی که از snapshot قبلی تغییر کرده‌اند"""
+
+    def __init__(self, executor, history=200):
+        self.executor = executor
+        self._lock = threading.Lock()
+        self._rules = []
+        self._compiled = []
+        self._version = 0
+        self._baseline = None
+        self._pending = None
+        self._scheduled = False
+        self._last_fired = {}
+        self.alerts = deque(maxlen=history)
+        self.evaluated_scan = None
+        self.evaluated_rows = 0
+        # خطای آخرین ارزیابی ناموفق (None بعد از ارزیابی موفق)
+        self.last_error = None
+
+    def rules(self):
+        with self._lock:
+            return list(self._rules)
+
+    def add_rule(self, rule):
+        """افزودن قانون - ارزیابی بعدی روی همه کوین‌ها انجام می‌شود"""
+        with self._lock:
+            self._rules.append(rule)
+            self._compiled = [(r, r.compile()) for r in self._rules]
+            self._version += 1
+            self._baseline = None
+        return rule
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            self._rules = [r for r in self._rules if r.rule_id != rule_id]
+            self._compiled = [(r, r.compile()) for r in self._rules]
+            self._version += 1
+            self._last_fired = {key: t for key, t in self._last_fired.items() if key[0] != rule_id}
+
+    def submit(self, snapshot):
+        """ارسال snapshot جدید به worker - snapshotهای میانی در صف جایگزین می‌شوند"""
+        if snapshot is None:
+            return
+        with self._lock:
+            self._pending = snapshot
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.executor.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    self._scheduled = False
+                    return
+                compiled, version = list(self._compiled), self._version
+                baseline = self._baseline
+            try:
+                fired, current, rows = self._evaluate(snapshot, compiled, baseline)
+            except Exception as e:
+                with self._lock:
+                    self.last_error = f"{datetime.now():%H:%M:%S} {snapshot.scan_id}: {type(e).__name__}: {e}"
+                continue
+            with self._lock:
+                self.last_error = None
+                # اگر قوانین حین ارزیابی عوض شده باشند، دفعه بعد همه کوین‌ها ارزیابی می‌شوند
+                self._baseline = current if self._version == version else None
+                self.alerts.extendleft(fired)
+                self.evaluated_scan = snapshot.scan_id
+                self.evaluated_rows = rows
+
+    def _evaluate(self, snapshot, compiled, baseline):
+        fields = list(RULE_FIELDS)
+        current = snapshot.frame.drop_duplicates("symbol").set_index("symbol")[fields]
+        if baseline is None:
+            changed = current
+        else:
+            previous = baseline.reindex(current.index)
+            mask = (previous.to_numpy() != current.to_numpy()).any(axis=1)
+            mask |= previous.isna().to_numpy().any(axis=1)
+            changed = current[mask]
+        if changed.empty or not compiled:
+            return [], current, len(changed)
+
+        now = time.time()
+        stamp = datetime.now().strftime("%H:%M:%S")
+        symbols = changed.index.to_numpy()
+        fired = []
+        for rule, predicate in compiled:
+            values = changed[rule.field].to_numpy()
+            for position in np.flatnonzero(predicate(values)):
+                symbol = symbols[position]
+                key = (rule.rule_id, symbol)
+                with self._lock:
+                    if now - self._last_fired.get(key, 0) < rule.cooldown:
+                        continue
+                    self._last_fired[key] = now
+                fired.append({
+                    "type": rule.alert_type,
+                    "coin": symbol,
+                    "message": f"{rule.describe()} ({_format_value(rule.field, values[position])})",
+                    "time": stamp,
+                    "rule_id": rule.rule_id,
+                    "created_at": now,
+                })
+        return fired, current, len(changed)
+
+    def recent(self, limit=50):
+        with self._lock:
+            return list(itertools.islice(self.alerts, limit))
+
+    def clear(self):
+        with self._lock:
+            self.alerts.clear()
+
+
+def _format_value(field, value):
+    if field == "volume_anomaly":
+        return "anomaly"
+    if field == "volume":
+        return f"${value / 1_000_000:,.1f}M"
+    if field == "signal_strength":
+        return f"{value:.1f}/10"
+    return f"{value:+.2f}%"
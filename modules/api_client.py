@@ -1,39 +1,161 @@
+import json
+import random
+import threading
+import time
 import requests
 import streamlit as st
 from datetime import datetime
+from config.constants import SCAN_STREAM_BATCH, SCAN_STREAM_CHUNK
+from modules.candle_store import records_from_history
+from modules.json_stream import ScanStreamDecoder
+from modules.metrics import registry as default_metrics
+from modules.profiler import span
+from modules.resilience import CircuitOpenError, shared_policy
+from modules.scheduler import INTERACTIVE, DeferredError, parse_retry_after, shared_scheduler
+from modules.shared_cache import shared_cache as default_shared
+
+def merge_scan_delta(cached, delta):
+    """ادغام کوین‌های تغییر کرده در اسکن قبلی بر اساس symbol"""
+    changed = {coin.get("symbol"): coin for coin in delta.get("coins", [])}
+    removed = set(delta.get("removed", []))
+    coins = []
+    for coin in cached.get("coins", []):
+        symbol = coin.get("symbol")
+        if symbol in removed:
+            continue
+        coins.append(changed.pop(symbol, coin))
+    # کوین‌های جدید به انتهای لیست اضافه می‌شوند
+    coins.extend(changed.values())
+
+    merged = {**cached, **{key: value for key, value in delta.items() if key not in ("coins", "removed", "delta")}}
+    merged["coins"] = coins
+    merged["changed_count"] = len(delta.get("coins", []))
+    return merged
+
 
 class VortexAPIClient:
-    def __init__(self, base_url):
+    def __init__(self, base_url, candle_store=None, history_refresh_interval=60, policy=None, metrics=None,
+                 shared=None, scheduler=None, priority=INTERACTIVE):
         self.base_url = base_url
         self.session = requests.Session()
-        self.timeout = 30
+        self.policy = policy or shared_policy(base_url)
+        # صف مشترک درخواست‌ها - کلاینت‌های پس‌زمینه با اولویت BACKGROUND ساخته می‌شوند
+        self.scheduler = scheduler or shared_scheduler(base_url)
+        self.priority = priority
+        self.metrics = metrics or default_metrics
+        # پاسخ‌های اسکن/تکنیکال/تاریخچه بین همه sessionها مشترک‌اند
+        self.shared = shared or default_shared
         self.request_count = 0
+        self._scan_cache = {}
+        self._last_good = {}
+        self.candle_store = candle_store
+        self.history_refresh_interval = history_refresh_interval
 
-    
+    def _request(self, endpoint, path, params=None, headers=None, idempotent=True, stream=False):
+        """
+        لایه مشترک همه درخواست‌ها: timeout تطبیقی، تلاش مجدد با backoff و circuit breaker
+        (با stream=True بدنه پاسخ خوانده نمی‌شود و latency تا رسیدن هدرهاست)
+        """
+        if not self.policy.allow(endpoint):
+            raise CircuitOpenError(f"{endpoint} circuit is open - upstream unhealthy")
 
-    # 🔥 این تابع رو اضافه کن:
-    def get_coin_technical(self, symbol):
-        """دریافت تحلیل تکنیکال برای یک کوین"""
+        attempts = self.policy.max_attempts if idempotent else 1
+        deadline = time.monotonic() + self.policy.deadline
+        for attempt in range(attempts):
+            with span(f"queue {endpoint}"):
+                self.scheduler.acquire(endpoint, self.priority, timeout=deadline - time.monotonic())
+            timeout = min(self.policy.timeout(endpoint), deadline - time.monotonic())
+            if timeout <= 0:
+                raise requests.Timeout(f"{endpoint}: call deadline of {self.policy.deadline}s exceeded")
+            started = time.perf_counter()
+            try:
+                with span(f"api {endpoint}"):
+                    response = self.session.get(
+                        f"{self.base_url}{path}",
+                        params=params,
+                        headers=headers,
+                        timeout=timeout,
+                        stream=stream
+                    )
+                self.request_count += 1
+                latency = time.perf_counter() - started
+                # در حالت stream حجم از هدر خوانده می‌شود (بایت‌های فشرده روی شبکه)
+                size = int(response.headers.get("Content-Length") or 0) if stream else len(response.content)
+                self.metrics.record_request(endpoint, latency, size)
+                if response.status_code in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        # صف این endpoint تا زمان اعلام شده سرور متوقف می‌شود
+                        self.scheduler.defer(endpoint, retry_after)
+                if response.status_code == 429 or response.status_code >= 500:
+                    response.close()
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                self.policy.record_success(endpoint, latency)
+                return response
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                timed_out = isinstance(e, requests.Timeout)
+                self.metrics.record_error(endpoint, timed_out=timed_out)
+                self.policy.record_failure(endpoint, timed_out=timed_out)
+                # timeout در سقف یعنی سرور پاسخ نمی‌دهد - تلاش مجدد فقط انتظار کاربر را چند برابر می‌کند
+                if timed_out and timeout >= self.policy.max_timeout:
+                    raise
+                delay = self.policy.backoff(attempt)
+                if (attempt + 1 >= attempts or time.monotonic() + delay >= deadline
+                        or not self.policy.allow(endpoint)):
+                    raise
+                time.sleep(delay)
+
+    def _decode(self, endpoint, response):
+        """decode کردن JSON با ثبت زمان آن"""
+        started = time.perf_counter()
+        data = response.json()
+        self.metrics.record_decode(endpoint, time.perf_counter() - started)
+        return data
+
+    def _decode_stream(self, endpoint, response, on_batch, batch_size=SCAN_STREAM_BATCH):
+        """
+        decode تدریجی پاسخ اسکن هم‌زمان با دانلود (gzip توسط requests باز می‌شود)؛
+        on_batch(coins) برای هر حداقل batch_size کوین رسیده صدا زده می‌شود
+        """
+        decoder = ScanStreamDecoder()
+        coins = []
+        reported = 0
+        decode_time = 0.0
+        with response:
+            for chunk in response.iter_content(chunk_size=SCAN_STREAM_CHUNK):
+                started = time.perf_counter()
+                coins.extend(decoder.feed(chunk))
+                decode_time += time.perf_counter() - started
+                if len(coins) - reported >= batch_size:
+                    on_batch(coins[reported:])
+                    reported = len(coins)
+        started = time.perf_counter()
+        data = decoder.finish()
+        self.metrics.record_decode(endpoint, decode_time + time.perf_counter() - started)
+        data["coins"] = coins
+        if reported < len(coins):
+            on_batch(coins[reported:])
+        return data
+
+    def _get_json(self, endpoint, path, params=None, cache_key=None):
+        """درخواست JSON با بازگرداندن آخرین پاسخ سالم در صورت خطا"""
+        key = (endpoint, cache_key or path)
         try:
-            response = self.session.get(
-                f"{self.base_url}/coin/{symbol}/technical",
-                timeout=self.timeout
-            )
-            self.request_count += 1
-            data = response.json()
-            return data if data.get("success") else None
-        except Exception as e:
-            st.error(f"🔧 Technical analysis error: {str(e)}")
-            return None
+            data = self._decode(endpoint, self._request(endpoint, path, params=params))
+        except (CircuitOpenError, DeferredError, requests.RequestException):
+            if key in self._last_good:
+                self.metrics.record_cache("stale_fallback", True)
+                return self._last_good[key]
+            self.metrics.record_cache("stale_fallback", False)
+            raise
+        if data.get("success"):
+            self._last_good[key] = data
+        return data
 
-   
-    
     def get_health_status(self):
         """دریافت وضعیت سلامت سرور"""
         try:
-            response = self.session.get(f"{self.base_url}/health-combined", timeout=self.timeout)
-            self.request_count += 1
-            return response.json()
+            return self._decode("health", self._request("health", "/health-combined"))
         except Exception as e:
             return {
                 "status": "offline",
@@ -42,110 +164,300 @@ class VortexAPIClient:
                 "api_status": {"requests_count": self.request_count},
                 "gist_status": {"total_coins": 0}
             }
-    
-    def scan_market(self, limit=100, filter_type="volume"):
+
+    def fetch_scan(self, limit=100, filter_type="volume", timeframe="24h", delta=True, on_batch=None):
+        """
+        اسکن مارکت بدون پیام UI (مناسب thread پس‌زمینه) - از کش مشترک؛
+        اسکن‌های یکسان همزمان sessionهای مختلف یک درخواست به سرور می‌فرستند.
+        با on_batch پاسخ کامل به صورت جریانی decode می‌شود و on_batch(coins)
+        برای هر بسته کوین رسیده صدا زده می‌شود (فقط برای session ارسال کننده درخواست)
         """
-        اسکن واقعی مارکت - مشابه endpoint اسکن شما
+        return self.shared.fetch(
+            "scan", (limit, filter_type, timeframe),
+            lambda: self._fetch_scan(limit, filter_type, timeframe, delta, on_batch),
+            cache_if=lambda data: data.get("success"),
+            priority=self.priority
+        )
+
+    def _fetch_scan(self, limit, filter_type, timeframe, delta, on_batch=None):
+        """
+        درخواست شرطی (ETag) و حالت delta
         /api/scan/vortexai
         """
-        try:
-            params = {
-                "limit": limit,
-                "filter": filter_type
+        cache_key = (limit, filter_type, timeframe)
+        cached = self._scan_cache.get(cache_key)
+        params = {
+            "limit": limit,
+            "filter": filter_type,
+            "timeframe": timeframe
+        }
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+            if delta and cached.get("server_time") is not None:
+                params["since"] = cached["server_time"]
+                params["delta"] = 1
+
+        # پاسخ‌های delta کوچک‌اند؛ فقط اسکن کامل به صورت جریانی خوانده می‌شود
+        stream = on_batch is not None and cached is None
+        response = self._request("scan", "/scan/vortexai", params=params, headers=headers, stream=stream)
+
+        # 304: هیچ تغییری نیست - بدون decode کردن JSON
+        not_modified = response.status_code == 304 and cached is not None
+        self.metrics.record_cache("scan_not_modified", not_modified)
+        if not_modified:
+            return cached["data"]
+
+        if stream:
+            data = self._decode_stream("scan", response, on_batch)
+        else:
+            data = self._decode("scan", response)
+        if data.get("success"):
+            if data.get("delta") and cached:
+                data = merge_scan_delta(cached["data"], data)
+            self._scan_cache[cache_key] = {
+                "data": data,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "server_time": data.get("server_time", data.get("timestamp")),
             }
-            
-            st.info(f"🔄 Scanning market with {limit} coins...")
-            response = self.session.get(
-                f"{self.base_url}/scan/vortexai", 
-                params=params, 
-                timeout=self.timeout
-            )
-            self.request_count += 1
-            
-            data = response.json()
-            
-            if data.get("success"):
-                st.success(f"✅ Received {len(data.get('coins', []))} coins from server")
-                return data
-            else:
-                st.error(f"❌ Scan failed: {data.get('error', 'Unknown error')}")
-                return None
-                
+        return data
+
+    def scan_market(self, limit=100, filter_type="volume", timeframe="24h", delta=True, on_batch=None):
+        """اسکن واقعی مارکت با تایم‌فریم و پیام‌های وضعیت (on_batch: نمایش تدریجی، fetch_scan را ببینید)"""
+        cached = self._scan_cache.get((limit, filter_type, timeframe))
+        previous = cached["data"] if cached else None
+        try:
+            st.info(f"🔍 Scanning market with {limit} coins ({timeframe})...")
+            data = self.fetch_scan(limit, filter_type, timeframe, delta, on_batch)
         except Exception as e:
-            st.error(f"🚨 API Error: {str(e)}")
+            if previous is not None:
+                st.warning(f"⚠️ Upstream unavailable, showing cached scan: {str(e)}")
+                return previous
+            st.error(f"🔍 API Error: {str(e)}")
+            return None
+
+        if data is previous:
+            st.success(f"✅ No changes since last scan ({timeframe})")
+        elif data.get("success"):
+            if previous is not None and data.get("changed_count") is not None:
+                st.success(f"✅ Merged {data['changed_count']} changed coins ({timeframe})")
+            else:
+                st.success(f"✅ Received {len(data.get('coins', []))} coins ({timeframe})")
+        else:
+            st.error(f"❌ Scan failed: {data.get('error', 'Unknown error')}")
             return None
-    
+        return data
+
+    def fetch_coin_technical(self, symbol):
+        """
+        دریافت خام تحلیل تکنیکال بدون پیام UI (مناسب thread پس‌زمینه)
+        /api/coin/{symbol}/technical
+        """
+        def fetch():
+            data = self._get_json("technical", f"/coin/{symbol}/technical")
+            return data if data.get("success") else None
+        return self.shared.fetch("technical", symbol, fetch, priority=self.priority)
+
     def get_coin_technical(self, symbol):
-        """دریافت تحلیل تکنیکال برای یک کوین - با اندپوینت صحیح"""
+        """دریافت تحلیل تکنیکال برای یک کوین"""
         try:
-            # تبدیل symbol به فرمت مورد نیاز سرور (مثلاً BTC -> btc_usdt)
-            formatted_symbol = f"{symbol.lower()}_usdt"
-        
-            response = self.session.get(
-                f"{self.base_url}/analysis",  # 🔥 اندپوینت صحیح
-                params={"symbol": formatted_symbol},  # 🔥 پارامتر صحیح
-                timeout=self.timeout
-            )
-            self.request_count += 1
-            data = response.json()
-            return data if data.get("success") else None
+            return self.fetch_coin_technical(symbol)
         except Exception as e:
             st.error(f"🔧 Technical analysis error: {str(e)}")
             return None
-    
+
     def get_coin_history(self, symbol, timeframe="24h"):
         """
         دریافت تاریخچه قیمت واقعی
         /api/coin/{symbol}/history/{timeframe}
         """
-        try:
-            response = self.session.get(
-                f"{self.base_url}/coin/{symbol}/history/{timeframe}",
-                timeout=self.timeout
-            )
-            self.request_count += 1
-            
-            data = response.json()
+        def fetch():
+            data = self._get_json("history", f"/coin/{symbol}/history/{timeframe}")
             return data if data.get("success") else None
-            
+        try:
+            return self.shared.fetch("history", (symbol, timeframe), fetch, priority=self.priority)
+
         except Exception as e:
             st.error(f"History data error: {str(e)}")
             return None
-    
+
+    def get_history_candles(self, symbol, timeframe="24h", start=None, end=None):
+        """
+        کندل‌های تاریخچه از کش دیسک - فقط آخرین کندل ذخیره شده و کندل‌های جدیدتر دریافت می‌شوند
+        خروجی: آرایه ساخت‌یافته CANDLE_DTYPE (view روی فایل)
+        """
+        key = (symbol, timeframe)
+        last = self.candle_store.last_timestamp(symbol, timeframe)
+        # زمان آخرین بررسی در کش مشترک - هر کوین فقط یک بار در هر بازه برای همه sessionها
+        checked = self.shared.get("history_checked", key, ttl=self.history_refresh_interval)
+        needs_refresh = last is None or checked is None
+        self.metrics.record_cache("history_disk", not needs_refresh)
+        if needs_refresh:
+            try:
+                self.shared.fetch(
+                    "history_checked", key,
+                    lambda: self._refresh_history(symbol, timeframe, last),
+                    ttl=self.history_refresh_interval,
+                    priority=self.priority
+                )
+            except (CircuitOpenError, DeferredError):
+                # سرور ناسالم یا متوقف (Retry-After) - فقط داده‌های ذخیره شده روی دیسک
+                pass
+            except Exception as e:
+                # در صورت خطا داده‌های ذخیره شده قبلی برگردانده می‌شوند
+                st.error(f"History data error: {str(e)}")
+        return self.candle_store.read(symbol, timeframe, start, end)
+
+    def _refresh_history(self, symbol, timeframe, last):
+        """دریافت کندل‌های از last به بعد و افزودن به کش دیسک - خروجی زمان بررسی"""
+        # since انحصاری است؛ last - 1 کندل آخر را هم برمی‌گرداند تا اگر هنوز در حال شکل‌گیری بود به‌روز شود
+        response = self._request(
+            "history",
+            f"/coin/{symbol}/history/{timeframe}",
+            params={"since": last - 1} if last is not None else None
+        )
+        data = self._decode("history", response)
+        if not data.get("success"):
+            return None
+        self.candle_store.append(symbol, timeframe, records_from_history(data))
+        return time.time()
+
     def get_exchange_price(self, exchange="Binance", from_coin="BTC", to_coin="USDT"):
         """دریافت قیمت از صرافی"""
         try:
-            response = self.session.get(
-                f"{self.base_url}/exchange/price",
+            return self._get_json(
+                "exchange_price",
+                "/exchange/price",
                 params={
                     "exchange": exchange,
                     "from": from_coin,
                     "to": to_coin,
                     "timestamp": int(datetime.now().timestamp())
                 },
-                timeout=self.timeout
+                cache_key=(exchange, from_coin, to_coin)
             )
-            self.request_count += 1
-            return response.json()
         except Exception as e:
             st.error(f"Exchange price error: {str(e)}")
             return None
-    
+
     def get_system_health(self):
         """سلامت کامل سیستم"""
         return self.get_health_status()
 
-    
-    def get_coin_technical(self, symbol):
-        """دریافت تحلیل تکنیکال برای یک کوین"""
+
+class PriceStream:
+    """
+    اشتراک دائمی قیمت‌های زنده (Server-Sent Events) با اتصال مجدد
+    /api/stream/prices
+    """
+
+    def __init__(self, base_url, path="/stream/prices", on_tick=None,
+                 backoff_base=1.0, backoff_max=60.0, read_timeout=60):
+        self.url = f"{base_url}{path}"
+        self.on_tick = on_tick
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.read_timeout = read_timeout
+        self.session = requests.Session()
+        self.connected = False
+        self.reconnects = 0
+        self.tick_count = 0
+        self.version = 0
+        self.last_error = None
+        self._quotes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """شروع thread اتصال (فقط یک بار)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vortex-price-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """قطع اتصال و توقف thread"""
+        self._stop.set()
+        self.connected = False
+
+    def _run(self):
+        delay = self.backoff_base
+        while not self._stop.is_set():
+            try:
+                with self.session.get(
+                    self.url,
+                    stream=True,
+                    headers={"Accept": "text/event-stream"},
+                    timeout=(10, self.read_timeout)
+                ) as response:
+                    response.raise_for_status()
+                    self.connected = True
+                    delay = self.backoff_base
+                    for line in response.iter_lines(decode_unicode=True):
+                        if self._stop.is_set():
+                            return
+                        if line and line.startswith("data:"):
+                            self._handle_event(line[5:].strip())
+                self.last_error = "stream closed by server"
+            except Exception as e:
+                self.last_error = str(e)
+            self.connected = False
+            if self._stop.is_set():
+                return
+            # backoff نمایی با jitter
+            self.reconnects += 1
+            self._stop.wait(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, self.backoff_max)
+
+    def _handle_event(self, payload):
         try:
-            response = self.session.get(
-                f"{self.base_url}/coin/{symbol}/technical",
-                timeout=self.timeout
-            )
-            self.request_count += 1
-            data = response.json()
-            return data if data.get("success") else None
-        except Exception as e:
-            st.error(f"🔧 Technical analysis error: {str(e)}")
-            return None
+            event = json.loads(payload)
+        except ValueError:
+            return
+        ticks = [tick for tick in (event if isinstance(event, list) else [event]) if isinstance(tick, dict)]
+        with self._lock:
+            for tick in ticks:
+                symbol = tick.get("symbol")
+                price = tick.get("price")
+                if not symbol or price is None:
+                    continue
+                quote = self._quotes.setdefault(symbol, {})
+                quote["price"] = price
+                if tick.get("volume") is not None:
+                    quote["volume"] = tick["volume"]
+                quote["ts"] = tick.get("ts")
+                self.tick_count += 1
+                self.version += 1
+        if self.on_tick:
+            for tick in ticks:
+                if tick.get("symbol") and tick.get("price") is not None:
+                    self.on_tick(tick["symbol"], tick["price"], tick.get("tick_volume"), tick.get("ts"))
+
+    def quotes(self):
+        """کپی آخرین قیمت/حجم هر کوین"""
+        with self._lock:
+            return {symbol: dict(quote) for symbol, quote in self._quotes.items()}
+
+    def apply_to(self, coins):
+        """اعمال آخرین قیمت‌ها روی لیست کوین‌ها - خروجی (لیست جدید، تعداد تغییرات)"""
+        quotes = self.quotes()
+        updated = []
+        changed = 0
+        for coin in coins:
+            quote = quotes.get(coin.get("symbol"))
+            if quote and (
+                coin.get("realtime_price") != quote["price"]
+                or ("volume" in quote and coin.get("realtime_volume") != quote["volume"])
+            ):
+                coin = {**coin, "realtime_price": quote["price"]}
+                if "volume" in quote:
+                    coin["realtime_volume"] = quote["volume"]
+                changed += 1
+            updated.append(coin)
+        return updated, changed
@@ -0,0 +1,115 @@
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from modules.indicators import candles_from_history
+
+# هر کندل یک رکورد 48 بایتی با طول ثابت
+CANDLE_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+def _to_epoch_seconds(values):
+    """تبدیل زمان (ثانیه، میلی‌ثانیه یا رشته تاریخ) به ثانیه unix"""
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().all():
+        seconds = numeric.to_numpy(dtype=np.float64)
+        return np.where(seconds > 1e12, seconds / 1000, seconds).astype(np.int64)
+    parsed = pd.to_datetime(values, errors="coerce", utc=True)
+    return (parsed.astype("int64") // 10**9).to_numpy()
+
+
+def records_from_history(payload):
+    """تبدیل پاسخ history سرور به آرایه ساخت‌یافته مرتب بر اساس زمان"""
+    frame = candles_from_history(payload).dropna(subset=["time"])
+    records = np.empty(len(frame), dtype=CANDLE_DTYPE)
+    if len(frame):
+        records["time"] = _to_epoch_seconds(frame["time"])
+        for field in CANDLE_DTYPE.names[1:]:
+            records[field] = frame[field].to_numpy(dtype=np.float64)
+        records.sort(order="time")
+    return records
+
+
+class CandleStore:
+    """کش دائمی کندل‌ها روی دیسک - یک فایل ستونی append-only برای هر (symbol, resolution)"""
+
+    def __init__(self, root):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, symbol, resolution):
+        safe_symbol = re.sub(r"[^A-Za-z0-9_.-]", "_", symbol.upper())
+        safe_resolution = re.sub(r"[^A-Za-z0-9_.-]", "_", resolution)
+        return os.path.join(self.root, safe_resolution, f"{safe_symbol}.bin")
+
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def last_timestamp(self, symbol, resolution):
+        """زمان آخرین کندل ذخیره شده (None اگر خالی باشد)"""
+        path = self._path(symbol, resolution)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        if size < CANDLE_DTYPE.itemsize:
+            return None
+        with open(path, "rb") as handle:
+            handle.seek(size - size % CANDLE_DTYPE.itemsize - CANDLE_DTYPE.itemsize)
+            last = np.frombuffer(handle.read(CANDLE_DTYPE.itemsize), dtype=CANDLE_DTYPE)
+        return int(last["time"][0])
+
+    def append(self, symbol, resolution, records):
+        """
+        افزودن کندل‌های جدیدتر از آخرین زمان ذخیره شده - کندلی با همان زمان آخرین کندل
+        (کندل در حال شکل‌گیری) جایگزین رکورد آخر فایل می‌شود
+        """
+        path = self._path(symbol, resolution)
+        with self._lock(path):
+            last = self.last_timestamp(symbol, resolution)
+            if last is not None:
+                records = records[records["time"] >= last]
+            if len(records) == 0:
+                return 0
+            # حذف زمان‌های تکراری داخل همین دسته - آخرین نسخه هر کندل نگه داشته می‌شود
+            _, unique_index = np.unique(records["time"][::-1], return_index=True)
+            records = records[len(records) - 1 - unique_index]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "r+b" if last is not None else "wb") as handle:
+                rows = os.fstat(handle.fileno()).st_size // CANDLE_DTYPE.itemsize
+                if last is not None and records["time"][0] == last:
+                    rows -= 1
+                # بازنویسی در محل بدون کوتاه کردن فایل - خواننده‌های memmap ردیف حذف شده نمی‌بینند
+                handle.seek(rows * CANDLE_DTYPE.itemsize)
+                handle.write(np.ascontiguousarray(records, dtype=CANDLE_DTYPE).tobytes())
+                # بایت‌های نیمه‌کاره یک نوشتن قطع شده قبلی
+                handle.truncate()
+            return len(records)
+
+    def read(self, symbol, resolution, start=None, end=None):
+        """خواندن بازه زمانی [start, end] به صورت view روی فایل memory-mapped (بدون کپی)"""
+        path = self._path(symbol, resolution)
+        try:
+            count = os.path.getsize(path) // CANDLE_DTYPE.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+        candles = np.memmap(path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))
+        times = candles["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = count if end is None else int(np.searchsorted(times, end, side="right"))
+        return candles[lo:hi]
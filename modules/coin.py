@@ -0,0 +1,73 @@
+# تایم‌فریم -> فیلد درصد تغییرات در Coin
+COIN_CHANGE_ATTRS = {
+    "1h": "change_1h",
+    "4h": "change_4h",
+    "24h": "change_1d",
+    "7d": "change_1w",
+}
+
+
+def _number(value, default=0.0):
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+class Coin:
+    """رکورد فشرده و نرمال‌شده کوین - فیلدهای جایگزین فقط یک بار در زمان دریافت اسکن حل می‌شوند"""
+
+    __slots__ = (
+        "symbol", "name", "price", "volume",
+        "change_1h", "change_4h", "change_1d", "change_1w",
+        "signal_strength", "volume_anomaly", "trend", "volatility_score",
+    )
+
+    def __init__(self, symbol, name, price=0.0, volume=0.0, change_1h=0.0, change_4h=None,
+                 change_1d=0.0, change_1w=0.0, signal_strength=0.0, volume_anomaly=False,
+                 trend="neutral", volatility_score=0.0):
+        self.symbol = symbol
+        self.name = name
+        self.price = price
+        self.volume = volume
+        self.change_1h = change_1h
+        self.change_4h = change_4h
+        self.change_1d = change_1d
+        self.change_1w = change_1w
+        self.signal_strength = signal_strength
+        self.volume_anomaly = volume_anomaly
+        self.trend = trend
+        self.volatility_score = volatility_score
+
+    @classmethod
+    def from_raw(cls, raw):
+        """ساخت از JSON خام سرور (realtime_price/price، priceChange1d/change_24h و VortexAI_analysis)"""
+        analysis = raw.get("VortexAI_analysis") or {}
+        change_4h = raw.get("priceChange4h")
+        return cls(
+            symbol=raw.get("symbol", "N/A"),
+            name=raw.get("name", "Unknown"),
+            price=_number(raw.get("realtime_price") or raw.get("price")),
+            volume=_number(raw.get("realtime_volume") or raw.get("volume")),
+            change_1h=_number(raw.get("priceChange1h")),
+            change_4h=_number(change_4h) if change_4h is not None else None,
+            change_1d=_number(raw.get("priceChange1d", raw.get("change_24h"))),
+            change_1w=_number(raw.get("priceChange1w")),
+            signal_strength=_number(analysis.get("signal_strength")),
+            volume_anomaly=bool(analysis.get("volume_anomaly", False)),
+            trend=analysis.get("trend") or "neutral",
+            volatility_score=_number(analysis.get("volatility_score")),
+        )
+
+    def change(self, timeframe):
+        """درصد تغییرات برای تایم‌فریم (پیش‌فرض 24 ساعته)"""
+        value = getattr(self, COIN_CHANGE_ATTRS.get(timeframe, "change_1d"))
+        return value if value is not None else 0.0
+
+    def __repr__(self):
+        return f"Coin({self.symbol!r}, price={self.price}, change_1d={self.change_1d})"
+
+
+def normalize_coins(raw_coins):
+    """تبدیل لیست خام اسکن به لیست Coin"""
+    return [Coin.from_raw(raw) for raw in raw_coins]
@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+
+from config.constants import FRAGMENT_CACHE_SIZE
+from modules.metrics import registry as default_metrics
+
+
+def theme_key(theme):
+    """کلید قابل hash برای دیکشنری تم"""
+    return tuple(sorted(theme.items())) if theme else None
+
+
+class FragmentCache:
+    """کش LRU برای HTML کارت‌ها - کلید، محتوای نمایشی کارت است"""
+
+    def __init__(self, capacity=4096, metrics=None):
+        self.capacity = capacity
+        self.metrics = metrics or default_metrics
+        self._lock = threading.Lock()
+        self._fragments = OrderedDict()
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def render(self, kind, key, build):
+        """HTML کش‌شده برای (kind, key) یا ساخت آن با build(); key باید hashable باشد"""
+        cache_key = (kind, key)
+        with self._lock:
+            html = self._fragments.get(cache_key)
+            if html is not None:
+                self._fragments.move_to_end(cache_key)
+        self.metrics.record_cache("html_fragments", html is not None)
+        if html is not None:
+            return html
+
+        html = build()
+        with self._lock:
+            self._fragments[cache_key] = html
+            self._fragments.move_to_end(cache_key)
+            while len(self._fragments) > self.capacity:
+                self._fragments.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+
+# کش مشترک کل پروسه
+fragments = FragmentCache(FRAGMENT_CACHE_SIZE)
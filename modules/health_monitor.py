@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class HealthMonitor:
+    """پایش پس‌زمینه سلامت سرور با کش TTL"""
+
+    def __init__(self, api_client, interval=15, ttl=60):
+        self.api_client = api_client
+        self.interval = interval
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = None
+        self._fetched_at = None
+
+    def start(self):
+        """شروع thread پایش (فقط یک بار)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="vortex-health-monitor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """توقف thread پایش"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def refresh(self):
+        """دریافت وضعیت جدید و ذخیره در کش"""
+        health = self.api_client.get_health_status()
+        with self._lock:
+            self._snapshot = health
+            self._fetched_at = time.time()
+        return health
+
+    def age(self):
+        """سن snapshot به ثانیه (None اگر هنوز دریافت نشده)"""
+        with self._lock:
+            if self._fetched_at is None:
+                return None
+            return time.time() - self._fetched_at
+
+    def get_snapshot(self):
+        """خواندن snapshot کش‌شده بدون هیچ درخواست شبکه"""
+        with self._lock:
+            snapshot, fetched_at = self._snapshot, self._fetched_at
+        if snapshot is None:
+            return {"status": "pending"}, None
+        age = time.time() - fetched_at
+        if age > self.ttl:
+            return {**snapshot, "status": "stale"}, age
+        return snapshot, age
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+CANDLE_COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+
+# نام‌های جایگزین فیلدها در پاسخ history سرور
+_FIELD_ALIASES = {
+    "time": ("time", "timestamp", "t", "date"),
+    "open": ("open", "o"),
+    "high": ("high", "h"),
+    "low": ("low", "l"),
+    "close": ("close", "c", "price"),
+    "volume": ("volume", "v"),
+}
+
+
+def _pick(entry, field):
+    for alias in _FIELD_ALIASES[field]:
+        if alias in entry and entry[alias] is not None:
+            return entry[alias]
+    return None
+
+
+def candles_from_history(payload):
+    """تبدیل پاسخ /coin/{symbol}/history به جدول OHLCV"""
+    if not payload:
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+    entries = payload
+    if isinstance(payload, dict):
+        entries = next(
+            (payload[key] for key in ("history", "candles", "data", "prices") if isinstance(payload.get(key), list)),
+            [],
+        )
+
+    rows = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            rows.append([_pick(entry, field) for field in CANDLE_COLUMNS])
+        elif isinstance(entry, (list, tuple)) and len(entry) >= 5:
+            rows.append((list(entry) + [0])[:6])
+
+    frame = pd.DataFrame(rows, columns=CANDLE_COLUMNS)
+    for column in CANDLE_COLUMNS[1:]:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    # اگر فقط قیمت بسته شدن موجود است، OHLC را از آن بساز
+    for column in ("open", "high", "low"):
+        frame[column] = frame[column].fillna(frame["close"])
+    frame["volume"] = frame["volume"].fillna(0.0)
+    return frame.dropna(subset=["close"]).reset_index(drop=True)
+
+
+def _wilder(series, period):
+    return series.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def _ema(series, period):
+    return series.ewm(span=period, adjust=False).mean()
+
+
+def rsi(close, period=14):
+    delta = close.diff()
+    gain = _wilder(delta.clip(lower=0), period)
+    loss = _wilder(-delta.clip(upper=0), period)
+    rs = gain / loss.replace(0, np.nan)
+    return (100 - 100 / (1 + rs)).where(loss != 0, 100.0)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = _ema(close, fast) - _ema(close, slow)
+    signal_line = _ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def stochastic_k(high, low, close, period=14):
+    lowest = low.rolling(period).min()
+    highest = high.rolling(period).max()
+    return 100 * (close - lowest) / (highest - lowest).replace(0, np.nan)
+
+
+def williams_r(high, low, close, period=14):
+    lowest = low.rolling(period).min()
+    highest = high.rolling(period).max()
+    return -100 * (highest - close) / (highest - lowest).replace(0, np.nan)
+
+
+def bollinger(close, period=20, width=2):
+    middle = close.rolling(period).mean()
+    std = close.rolling(period).std(ddof=0)
+    return middle + width * std, middle, middle - width * std
+
+
+def true_range(high, low, close):
+    prev_close = close.shift()
+    return pd.concat(
+        [high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1
+    ).max(axis=1)
+
+
+def atr(high, low, close, period=14):
+    return _wilder(true_range(high, low, close), period)
+
+
+def adx(high, low, close, period=14):
+    up = high.diff()
+    down = -low.diff()
+    plus_dm = up.where((up > down) & (up > 0), 0.0)
+    minus_dm = down.where((down > up) & (down > 0), 0.0)
+    smoothed_tr = _wilder(true_range(high, low, close), period).replace(0, np.nan)
+    plus_di = 100 * _wilder(plus_dm, period) / smoothed_tr
+    minus_di = 100 * _wilder(minus_dm, period) / smoothed_tr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, np.nan)
+    return _wilder(dx, period)
+
+
+def obv(close, volume):
+    direction = np.sign(close.diff().fillna(0))
+    return (direction * volume).cumsum()
+
+
+def cci(high, low, close, period=20):
+    typical = ((high + low + close) / 3).to_numpy()
+    result = np.full(len(typical), np.nan)
+    if len(typical) >= period:
+        windows = sliding_window_view(typical, period)
+        mean = windows.mean(axis=1)
+        mean_dev = np.abs(windows - mean[:, None]).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[period - 1:] = (typical[period - 1:] - mean) / (0.015 * mean_dev)
+    return pd.Series(result, index=close.index)
+
+
+def _last(series):
+    if series is None or len(series) == 0:
+        return None
+    value = series.iloc[-1]
+    return None if pd.isna(value) or np.isinf(value) else float(value)
+
+
+def compute_indicators(candles):
+    """محاسبه برداری همه اندیکاتورها - کلیدها مشابه technical_indicators سرور"""
+    if candles is None or len(candles) < 2:
+        return {}
+
+    high, low, close, volume = candles["high"], candles["low"], candles["close"], candles["volume"]
+    macd_line, signal_line, histogram = macd(close)
+    upper, middle, lower = bollinger(close)
+
+    values = {
+        "rsi": _last(rsi(close)),
+        "macd": _last(macd_line),
+        "macd_signal": _last(signal_line),
+        "macd_histogram": _last(histogram),
+        "stochastic_k": _last(stochastic_k(high, low, close)),
+        "williams_r": _last(williams_r(high, low, close)),
+        "bollinger_upper": _last(upper),
+        "bollinger_middle": _last(middle),
+        "bollinger_lower": _last(lower),
+        "moving_avg_20": _last(close.rolling(20).mean()),
+        "moving_avg_50": _last(close.rolling(50).mean()),
+        "atr": _last(atr(high, low, close)),
+        "adx": _last(adx(high, low, close)),
+        "obv": _last(obv(close, volume)),
+        "cci": _last(cci(high, low, close)),
+    }
+    # مقادیر ناقص (پنجره کوتاه‌تر از دوره) حذف می‌شوند تا پیش‌فرض UI استفاده شود
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def compute_support_resistance(candles, windows=(20, 50)):
+    """سطوح حمایت/مقاومت از کف و سقف پنجره‌های اخیر"""
+    if candles is None or len(candles) == 0:
+        return {"support": [0, 0], "resistance": [0, 0]}
+    support = [float(candles["low"].tail(window).min()) for window in windows]
+    resistance = [float(candles["high"].tail(window).max()) for window in windows]
+    return {"support": support, "resistance": resistance}
+
+
+def compare_with_server(local, server, tolerance=0.05):
+    """مقایسه مقادیر محلی با مقادیر سرور (اختلاف نسبی)"""
+    rows = []
+    for key in sorted(set(local) & set(server)):
+        try:
+            local_value, server_value = float(local[key]), float(server[key])
+        except (TypeError, ValueError):
+            continue
+        scale = max(abs(server_value), 1e-9)
+        deviation = abs(local_value - server_value) / scale
+        rows.append({
+            "indicator": key,
+            "local": local_value,
+            "server": server_value,
+            "deviation": deviation,
+            "match": deviation <= tolerance,
+        })
+    return rows
@@ -0,0 +1,115 @@
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:  # اختیاری - بدون آن فقط decoder استاندارد json استفاده می‌شود
+    orjson = None
+
+_SKIP = " \t\r\n,"
+
+
+class ScanStreamDecoder:
+    """
+    decode تدریجی پاسخ JSON اسکن: رکوردهای آرایه coins به محض کامل شدن بازگردانده می‌شوند
+    و بقیه فیلدهای پاسخ در finish()
+    """
+
+    def __init__(self, key="coins"):
+        self.key = key
+        self._marker = f'"{key}"'
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._text = ""
+        self._head = None
+        self._tail = None
+        self.count = 0
+
+    def feed(self, chunk):
+        """افزودن یک chunk از بدنه پاسخ - خروجی رکوردهای کامل شده"""
+        self._text += self._utf8.decode(chunk)
+        if self._head is None and not self._find_array():
+            return []
+        if self._tail is not None:
+            self._tail += self._text
+            self._text = ""
+            return []
+        records = self._records()
+        self.count += len(records)
+        return records
+
+    def _find_array(self):
+        """پیدا کردن شروع آرایه "coins": [ - متن قبل از آن برای finish نگه داشته می‌شود"""
+        text = self._text
+        start = 0
+        while True:
+            found = text.find(self._marker, start)
+            if found < 0:
+                return False
+            pos = found + len(self._marker)
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(text) and text[pos] == ":":
+                pos += 1
+                while pos < len(text) and text[pos] in " \t\r\n":
+                    pos += 1
+                if pos >= len(text):
+                    # ادامه پاسخ هنوز نرسیده
+                    return False
+                if text[pos] == "[":
+                    self._head = text[:pos]
+                    self._text = text[pos + 1:]
+                    return True
+            elif pos >= len(text):
+                return False
+            start = found + 1
+
+    def _records(self):
+        text = self._text
+        pos = 0
+        records = []
+        if orjson is not None:
+            pos = self._skip(text, pos)
+            end = text.rfind("}")
+            if end > pos:
+                # برش تا آخرین '}' فقط وقتی معتبر است که دقیقاً چند رکورد کامل باشد
+                try:
+                    records = orjson.loads("[" + text[pos:end + 1] + "]")
+                    pos = end + 1
+                except orjson.JSONDecodeError:
+                    pass
+        while True:
+            pos = self._skip(text, pos)
+            if pos >= len(text):
+                break
+            if text[pos] == "]":
+                self._tail = text[pos + 1:]
+                pos = len(text)
+                break
+            try:
+                record, pos = self._decoder.raw_decode(text, pos)
+            except ValueError:
+                # رکورد ناقص - بقیه آن با chunk بعدی می‌رسد
+                break
+            records.append(record)
+        self._text = text[pos:]
+        return records
+
+    @staticmethod
+    def _skip(text, pos):
+        while pos < len(text) and text[pos] in _SKIP:
+            pos += 1
+        return pos
+
+    def finish(self):
+        """فیلدهای غیر از coins پس از دریافت کامل پاسخ - ValueError اگر پاسخ ناقص باشد"""
+        self._text += self._utf8.decode(b"", final=True)
+        if self._head is None:
+            document = self._text
+        elif self._tail is None:
+            raise ValueError(f"truncated JSON response: '{self.key}' array not closed")
+        else:
+            document = self._head + "[]" + self._tail
+        data = json.loads(document)
+        data.pop(self.key, None)
+        return data
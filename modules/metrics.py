@@ -0,0 +1,124 @@
+import bisect
+import threading
+
+# مرز باکت‌های هیستوگرام به ثانیه: 0.5ms تا حدود 60s با نسبت ثابت
+LATENCY_BUCKETS = [0.0005 * 1.25 ** i for i in range(53)]
+
+
+class LatencyHistogram:
+    """هیستوگرام با باکت‌های ثابت لگاریتمی - ثبت O(log n) و حافظه ثابت"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """تخمین صدک p (0..100) به صورت مرز بالای باکت"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes = 0
+        self.latency = LatencyHistogram()
+        self.decode = LatencyHistogram()
+
+
+class MetricsRegistry:
+    """آمار درون‌پروسه‌ای درخواست‌ها و کش‌ها"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._caches = {}
+
+    def _endpoint(self, endpoint):
+        if endpoint not in self._endpoints:
+            self._endpoints[endpoint] = EndpointMetrics()
+        return self._endpoints[endpoint]
+
+    def record_request(self, endpoint, latency, size):
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.requests += 1
+            metrics.bytes += size
+            metrics.latency.record(latency)
+
+    def record_error(self, endpoint, timed_out=False):
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.errors += 1
+            if timed_out:
+                metrics.timeouts += 1
+
+    def record_decode(self, endpoint, seconds):
+        with self._lock:
+            self._endpoint(endpoint).decode.record(seconds)
+
+    def record_cache(self, cache, hit):
+        with self._lock:
+            hits, misses = self._caches.get(cache, (0, 0))
+            self._caches[cache] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._caches.clear()
+
+    def endpoint_rows(self):
+        """جدول آمار endpointها (زمان‌ها به میلی‌ثانیه)"""
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint,
+                    "requests": m.requests,
+                    "errors": m.errors,
+                    "timeouts": m.timeouts,
+                    "p50 ms": ms(m.latency.percentile(50)),
+                    "p95 ms": ms(m.latency.percentile(95)),
+                    "p99 ms": ms(m.latency.percentile(99)),
+                    "avg KB": round(m.bytes / m.requests / 1024, 1) if m.requests else 0.0,
+                    "decode p95 ms": ms(m.decode.percentile(95)),
+                }
+                for endpoint, m in sorted(self._endpoints.items())
+            ]
+
+    def cache_rows(self):
+        """جدول نسبت hit کش‌ها"""
+        with self._lock:
+            return [
+                {
+                    "cache": cache,
+                    "hits": hits,
+                    "misses": misses,
+                    "hit ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                }
+                for cache, (hits, misses) in sorted(self._caches.items())
+            ]
+
+
+# رجیستری مشترک کل پروسه
+registry = MetricsRegistry()
@@ -0,0 +1,110 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.metrics import registry as default_metrics
+
+
+class TechnicalPrefetcher:
+    """پیش‌واکشی همزمان تحلیل تکنیکال برای کوین‌های اسکن شده"""
+
+    def __init__(self, client_factory, max_workers=8, ttl=300, retry_after=60, metrics=None):
+        self.client_factory = client_factory
+        self.metrics = metrics or default_metrics
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vortex-prefetch"
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._failed = {}
+        self._in_flight = set()
+        self._history_warmed = {}
+
+    def _client(self):
+        # هر worker کلاینت (و session) مخصوص خودش را دارد
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self.client_factory()
+            self._local.client = client
+        return client
+
+    def _is_fresh(self, symbol, now):
+        entry = self._cache.get(symbol)
+        return entry is not None and now - entry[1] < self.ttl
+
+    def warm(self, symbols):
+        """ارسال کوین‌هایی که در کش نیستند به صف واکشی"""
+        now = time.time()
+        submitted = 0
+        with self._lock:
+            for symbol in symbols:
+                if symbol in self._in_flight or self._is_fresh(symbol, now):
+                    continue
+                if now - self._failed.get(symbol, 0) < self.retry_after:
+                    continue
+                self._in_flight.add(symbol)
+                self._executor.submit(self._fetch, symbol)
+                submitted += 1
+        return submitted
+
+    def warm_history(self, symbols, timeframe):
+        """
+        گرم کردن کش دیسک کندل‌ها برای اندیکاتورهای محلی - تاریخچه هر کوین حداکثر یک بار در هر ttl
+        خروجی: تعداد کوین‌های ارسال شده به صف
+        """
+        now = time.time()
+        submitted = 0
+        with self._lock:
+            for symbol in symbols:
+                key = ("history", symbol, timeframe)
+                if key in self._in_flight or now - self._history_warmed.get(key, 0) < self.ttl:
+                    continue
+                self._in_flight.add(key)
+                self._executor.submit(self._fetch_history, key)
+                submitted += 1
+        return submitted
+
+    def _fetch_history(self, key):
+        _, symbol, timeframe = key
+        try:
+            # کندل‌ها در candle_store کلاینت ذخیره می‌شوند - خروجی لازم نیست
+            self._client().get_history_candles(symbol, timeframe)
+        except Exception:
+            pass
+        with self._lock:
+            self._in_flight.discard(key)
+            self._history_warmed[key] = time.time()
+
+    def _fetch(self, symbol):
+        try:
+            data = self._client().fetch_coin_technical(symbol)
+        except Exception:
+            data = None
+        with self._lock:
+            self._in_flight.discard(symbol)
+            if data:
+                self._cache[symbol] = (data, time.time())
+                self._failed.pop(symbol, None)
+            else:
+                self._failed[symbol] = time.time()
+
+    def get(self, symbol):
+        """خواندن داده تکنیکال از کش (None اگر موجود یا تازه نباشد)"""
+        with self._lock:
+            hit = self._is_fresh(symbol, time.time())
+            data = self._cache[symbol][0] if hit else None
+        self.metrics.record_cache("technical_prefetch", hit)
+        return data
+
+    def put(self, symbol, data):
+        """ذخیره داده‌ای که خارج از prefetch دریافت شده"""
+        with self._lock:
+            self._cache[symbol] = (data, time.time())
+
+    def status(self):
+        """تعداد کوین‌های کش‌شده و در حال دریافت"""
+        with self._lock:
+            return len(self._cache), len(self._in_flight)
@@ -0,0 +1,111 @@
+import contextvars
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# rerun فعال در thread فعلی (thread اسکریپت Streamlit)
+_active_trace = contextvars.ContextVar("vortex_active_trace", default=None)
+
+
+class RerunTrace:
+    """spanهای ثبت شده در یک rerun"""
+
+    def __init__(self, rerun_id):
+        self.rerun_id = rerun_id
+        self.wall_start = time.time()
+        self.started = time.perf_counter()
+        self.depth = 0
+        self.spans = []
+
+    @property
+    def duration(self):
+        root = next((s for s in self.spans if s["depth"] == 0), None)
+        return root["duration"] if root else 0.0
+
+
+def active_trace():
+    """trace rerun در حال ثبت در thread فعلی (None اگر پروفایلر فعال نباشد)"""
+    return _active_trace.get()
+
+
+@contextmanager
+def span(name):
+    """زمان‌سنجی یک بخش - اگر پروفایلر فعال نباشد هیچ هزینه‌ای ندارد"""
+    trace = _active_trace.get()
+    if trace is None:
+        yield
+        return
+    depth = trace.depth
+    trace.depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.depth -= 1
+        trace.spans.append({
+            "name": name,
+            "start": started - trace.started,
+            "duration": time.perf_counter() - started,
+            "depth": depth,
+        })
+
+
+class RerunProfiler:
+    """پروفایلر اختیاری rerunها با بافر حلقوی N rerun آخر"""
+
+    def __init__(self, capacity=20):
+        self.reruns = deque(maxlen=capacity)
+        self._next_id = 0
+
+    @contextmanager
+    def rerun(self, name="rerun"):
+        """trace یک rerun کامل یا یک rerun جزئی fragment - داخل rerun فعال فقط یک span است"""
+        active = _active_trace.get()
+        if active is not None:
+            with span(name):
+                yield active
+            return
+        trace = RerunTrace(self._next_id)
+        self._next_id += 1
+        token = _active_trace.set(trace)
+        try:
+            with span(name):
+                yield trace
+        finally:
+            _active_trace.reset(token)
+            self.reruns.append(trace)
+
+    def last(self):
+        return self.reruns[-1] if self.reruns else None
+
+    def phase_rows(self, trace=None):
+        """جدول spanهای یک rerun به ترتیب شروع (میلی‌ثانیه)"""
+        trace = trace or self.last()
+        if trace is None:
+            return []
+        return [
+            {
+                "phase": "  " * s["depth"] + s["name"],
+                "start ms": round(s["start"] * 1000, 1),
+                "duration ms": round(s["duration"] * 1000, 1),
+            }
+            for s in sorted(trace.spans, key=lambda s: (s["start"], s["depth"]))
+        ]
+
+    def chrome_trace(self):
+        """خروجی Chrome trace (قابل باز کردن در chrome://tracing، Perfetto یا speedscope)"""
+        events = []
+        for trace in self.reruns:
+            for s in trace.spans:
+                events.append({
+                    "name": s["name"],
+                    "cat": "rerun",
+                    "ph": "X",
+                    "ts": round((trace.wall_start + s["start"]) * 1e6),
+                    "dur": round(s["duration"] * 1e6),
+                    "pid": 1,
+                    "tid": 1,
+                    "args": {"rerun": trace.rerun_id},
+                })
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """درخواست به دلیل باز بودن circuit breaker ارسال نشد"""
+
+
+class AdaptiveTimeout:
+    """timeout هر endpoint بر اساس تاخیر مشاهده شده (مشابه RTO در TCP)"""
+
+    def __init__(self, initial=5.0, minimum=2.0, maximum=30.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.srtt = None
+        self.rttvar = None
+        self.value = initial
+
+    def observe(self, latency):
+        if self.srtt is None:
+            self.srtt, self.rttvar = latency, latency / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - latency)
+            self.srtt = 0.875 * self.srtt + 0.125 * latency
+        self.value = min(max(self.srtt + 4 * self.rttvar, self.minimum), self.maximum)
+
+    def on_timeout(self):
+        # بعد از timeout دو برابر می‌شود تا سرور در حال cold start فرصت پاسخ داشته باشد
+        self.value = min(self.value * 2, self.maximum)
+
+
+class CircuitBreaker:
+    """بعد از چند خطای پشت سر هم درخواست‌ها را برای مدتی بدون ارسال رد می‌کند"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def allow(self):
+        now = time.time()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self.probe_started = None
+        if self.state == self.HALF_OPEN:
+            # فقط یک درخواست آزمایشی؛ بقیه تا نتیجه آن رد می‌شوند
+            # (آزمایشی که نتیجه‌اش ثبت نشده بعد از reset_timeout جایگزین می‌شود)
+            if self.probe_started is not None and now - self.probe_started < self.reset_timeout:
+                return False
+            self.probe_started = now
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_started = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.time()
+
+
+class RequestPolicy:
+    """وضعیت مشترک timeout و circuit breaker برای همه endpointهای یک سرور"""
+
+    def __init__(self, max_attempts=3, backoff_base=0.5, backoff_cap=8.0,
+                 initial_timeout=5.0, min_timeout=2.0, max_timeout=30.0, deadline=20.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.max_attempts = max_attempts
+        # سقف زمان کل یک فراخوانی (همه تلاش‌ها و backoffها) تا rerun بیش از این منتظر نماند
+        self.deadline = deadline
+        self.max_timeout = max_timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._timeout_args = (initial_timeout, min_timeout, max_timeout)
+        self._breaker_args = (failure_threshold, reset_timeout)
+        self._timeouts = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _timeout_state(self, endpoint):
+        if endpoint not in self._timeouts:
+            self._timeouts[endpoint] = AdaptiveTimeout(*self._timeout_args)
+        return self._timeouts[endpoint]
+
+    def _breaker(self, endpoint):
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = CircuitBreaker(*self._breaker_args)
+        return self._breakers[endpoint]
+
+    def timeout(self, endpoint):
+        with self._lock:
+            return self._timeout_state(endpoint).value
+
+    def allow(self, endpoint):
+        with self._lock:
+            return self._breaker(endpoint).allow()
+
+    def record_success(self, endpoint, latency):
+        with self._lock:
+            self._timeout_state(endpoint).observe(latency)
+            self._breaker(endpoint).record_success()
+
+    def record_failure(self, endpoint, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self._timeout_state(endpoint).on_timeout()
+            self._breaker(endpoint).record_failure()
+
+    def backoff(self, attempt):
+        """تاخیر قبل از تلاش مجدد - backoff نمایی با full jitter"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def state(self):
+        """وضعیت فعلی هر endpoint برای نمایش"""
+        with self._lock:
+            endpoints = set(self._timeouts) | set(self._breakers)
+            return {
+                endpoint: {
+                    "timeout": self._timeouts[endpoint].value if endpoint in self._timeouts else None,
+                    "circuit": self._breakers[endpoint].state if endpoint in self._breakers else CircuitBreaker.CLOSED,
+                }
+                for endpoint in endpoints
+            }
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def shared_policy(base_url):
+    """یک RequestPolicy مشترک برای هر آدرس سرور در کل پروسه"""
+    with _policies_lock:
+        if base_url not in _policies:
+            _policies[base_url] = RequestPolicy()
+        return _policies[base_url]
@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.metrics import registry as default_metrics
+
+
+class ScanCache:
+    """کش اسکن برای هر تایم‌فریم با TTL مستقل و پیش‌واکشی پس‌زمینه تایم‌فریم‌های دیگر"""
+
+    def __init__(self, client_factory, ttls, default_ttl=300, max_workers=3, metrics=None):
+        self.client_factory = client_factory
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.metrics = metrics or default_metrics
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vortex-scan-prefetch"
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._in_flight = set()
+
+    def _client(self):
+        # هر worker کلاینت (و کش ETag) مخصوص خودش را دارد
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self.client_factory()
+            self._local.client = client
+        return client
+
+    def ttl(self, timeframe):
+        return self.ttls.get(timeframe, self.default_ttl)
+
+    def _is_fresh(self, key, now):
+        entry = self._entries.get(key)
+        return entry is not None and now - entry[1] < self.ttl(key[0])
+
+    def get(self, timeframe, limit, filter_type):
+        """خروجی (data, fetched_at, fresh) - data برابر None اگر این تایم‌فریم کش نشده باشد"""
+        key = (timeframe, limit, filter_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = self._is_fresh(key, time.time())
+        self.metrics.record_cache("scan_timeframe", fresh)
+        if entry is None:
+            return None, None, False
+        return entry[0], entry[1], fresh
+
+    def put(self, timeframe, limit, filter_type, data):
+        with self._lock:
+            self._entries[(timeframe, limit, filter_type)] = (data, time.time())
+
+    def warm(self, timeframes, limit, filter_type):
+        """واکشی پس‌زمینه تایم‌فریم‌هایی که کش نشده یا کهنه شده‌اند"""
+        now = time.time()
+        submitted = 0
+        with self._lock:
+            for timeframe in timeframes:
+                key = (timeframe, limit, filter_type)
+                if key in self._in_flight or self._is_fresh(key, now):
+                    continue
+                self._in_flight.add(key)
+                self._executor.submit(self._fetch, key)
+                submitted += 1
+        return submitted
+
+    def _fetch(self, key):
+        timeframe, limit, filter_type = key
+        try:
+            data = self._client().fetch_scan(limit, filter_type, timeframe)
+        except Exception:
+            data = None
+        with self._lock:
+            self._in_flight.discard(key)
+            if data and data.get("success"):
+                self._entries[key] = (data, time.time())
+
+    def status(self):
+        """سن هر تایم‌فریم کش‌شده به ثانیه و تعداد در حال دریافت"""
+        now = time.time()
+        with self._lock:
+            ages = {key[0]: now - fetched_at for key, (_, fetched_at) in self._entries.items()}
+            return ages, len(self._in_flight)
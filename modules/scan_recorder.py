@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+# فهرست اسکن‌ها: زمان اسکن و بازه ردیف‌های آن در فایل‌های ستونی
+SCAN_INDEX_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("start", "<i8"),
+    ("count", "<i8"),
+])
+
+# هر فیلد یک فایل ستونی جدا با طول ثابت (یک ردیف برای هر کوین هر اسکن)
+SCAN_COLUMNS = {
+    "symbol_id": np.dtype("<i4"),
+    "price": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+    "signal_strength": np.dtype("<f4"),
+}
+
+# خروجی پرس‌وجوی یک کوین
+SCAN_POINT_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("price", "<f8"),
+    ("volume", "<f8"),
+    ("signal_strength", "<f4"),
+])
+
+
+def scan_timestamp(data):
+    """زمان اسکن از پاسخ سرور (ثانیه unix) - زمان فعلی اگر عددی نباشد"""
+    for key in ("server_time", "timestamp"):
+        try:
+            value = float(data.get(key))
+        except (TypeError, ValueError):
+            continue
+        return value / 1000 if value > 1e12 else value
+    return time.time()
+
+
+class ScanRecorder:
+    """
+    ثبت append-only همه اسکن‌ها روی دیسک به صورت ستونی:
+    symbols.txt (شناسه هر symbol شماره خط آن است)، scans.bin و یک فایل برای هر فیلد
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._symbols = []
+        self._symbol_ids = {}
+        self._load_symbols()
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _load_symbols(self):
+        try:
+            with open(self._path("symbols.txt"), encoding="utf-8") as handle:
+                self._symbols = handle.read().splitlines()
+        except OSError:
+            self._symbols = []
+        self._symbol_ids = {symbol: index for index, symbol in enumerate(self._symbols)}
+
+    def _symbol_id(self, symbol, new_symbols):
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            new_symbols.append(symbol)
+        return symbol_id
+
+    def _scan_index(self):
+        """فهرست اسکن‌های ثبت شده به صورت memory-mapped"""
+        path = self._path("scans.bin")
+        try:
+            count = os.path.getsize(path) // SCAN_INDEX_DTYPE.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=SCAN_INDEX_DTYPE)
+        return np.memmap(path, dtype=SCAN_INDEX_DTYPE, mode="r", shape=(count,))
+
+    def _column(self, field, rows):
+        return np.memmap(self._path(f"{field}.bin"), dtype=SCAN_COLUMNS[field], mode="r", shape=(rows,))
+
+    def record(self, coins, timestamp):
+        """افزودن یک اسکن (لیست Coin) - اسکن‌های قدیمی‌تر یا هم‌زمان با آخرین اسکن نادیده گرفته می‌شوند"""
+        coins = [coin for coin in coins if coin.symbol]
+        with self._lock:
+            scans = self._scan_index()
+            if len(scans) and timestamp <= scans["time"][-1]:
+                return 0
+            rows = int(scans["start"][-1] + scans["count"][-1]) if len(scans) else 0
+            del scans
+
+            new_symbols = []
+            columns = {
+                "symbol_id": np.fromiter(
+                    (self._symbol_id(coin.symbol, new_symbols) for coin in coins), np.int32, len(coins)
+                ),
+                "price": np.fromiter((coin.price for coin in coins), np.float64, len(coins)),
+                "volume": np.fromiter((coin.volume for coin in coins), np.float64, len(coins)),
+                "signal_strength": np.fromiter((coin.signal_strength for coin in coins), np.float32, len(coins)),
+            }
+
+            os.makedirs(self.root, exist_ok=True)
+            if new_symbols:
+                with open(self._path("symbols.txt"), "a", encoding="utf-8") as handle:
+                    handle.write("".join(f"{symbol}\n" for symbol in new_symbols))
+            for field, values in columns.items():
+                with open(self._path(f"{field}.bin"), "ab") as handle:
+                    # ردیف‌های نیمه‌کاره یک ثبت قطع شده قبلی حذف می‌شوند
+                    handle.truncate(rows * SCAN_COLUMNS[field].itemsize)
+                    handle.write(values.astype(SCAN_COLUMNS[field], copy=False).tobytes())
+            # ثبت اسکن در فهرست آخرین مرحله است؛ تا قبل از آن ردیف‌ها دیده نمی‌شوند
+            entry = np.array([(timestamp, rows, len(coins))], dtype=SCAN_INDEX_DTYPE)
+            with open(self._path("scans.bin"), "ab") as handle:
+                handle.write(entry.tobytes())
+            return len(coins)
+
+    def scan_times(self, start=None, end=None):
+        """زمان اسکن‌های ثبت شده در بازه [start, end]"""
+        times = self._scan_index()["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side="right"))
+        return np.array(times[lo:hi])
+
+    def read(self, symbol, start=None, end=None):
+        """سری زمانی یک کوین در بازه [start, end] - فقط ردیف‌های همان بازه از دیسک خوانده می‌شوند"""
+        symbol_id = self._symbol_ids.get(symbol)
+        scans = self._scan_index()
+        if symbol_id is None or len(scans) == 0:
+            return np.empty(0, dtype=SCAN_POINT_DTYPE)
+
+        times = scans["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(scans) if end is None else int(np.searchsorted(times, end, side="right"))
+        if lo >= hi:
+            return np.empty(0, dtype=SCAN_POINT_DTYPE)
+        first_row = int(scans["start"][lo])
+        last_row = int(scans["start"][hi - 1] + scans["count"][hi - 1])
+
+        rows = np.flatnonzero(self._column("symbol_id", last_row)[first_row:] == symbol_id) + first_row
+        points = np.empty(len(rows), dtype=SCAN_POINT_DTYPE)
+        # هر ردیف به اسکنی تعلق دارد که شروع آن آخرین شروع کوچک‌تر یا مساوی ردیف است
+        points["time"] = times[np.searchsorted(scans["start"], rows, side="right") - 1]
+        for field in ("price", "volume", "signal_strength"):
+            points[field] = self._column(field, last_row)[rows]
+        return points
+
+    def status(self):
+        """تعداد اسکن‌ها، ردیف‌ها و symbolهای ثبت شده و حجم روی دیسک (بایت)"""
+        scans = self._scan_index()
+        rows = int(scans["start"][-1] + scans["count"][-1]) if len(scans) else 0
+        size = 0
+        for name in ["symbols.txt", "scans.bin", *(f"{field}.bin" for field in SCAN_COLUMNS)]:
+            try:
+                size += os.path.getsize(self._path(name))
+            except OSError:
+                pass
+        return len(scans), rows, len(self._symbols), size
@@ -0,0 +1,187 @@
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.constants import TOP_MOVERS_MAX_K
+from modules.coin import normalize_coins
+from modules.symbol_index import SymbolIndex
+
+_scan_ids = itertools.count(1)
+
+STRONG_SIGNAL_THRESHOLD = 7
+
+# نگاشت تایم‌فریم به ستون درصد تغییرات
+TIMEFRAME_CHANGE_FIELDS = {
+    "1h": "priceChange1h",
+    "24h": "priceChange1d",
+    "7d": "priceChange1w",
+}
+
+# مرتب‌سازی‌های نوار کناری و ستون متناظر در جدول اسکن
+SCAN_SORT_FIELDS = {
+    "volume": "volume",
+    "momentum_1h": "priceChange1h",
+    "momentum_4h": "priceChange4h",
+    "ai_signal": "signal_strength",
+}
+
+def top_k_indices(values, k, largest=True):
+    """ردیف‌های k مقدار بزرگ‌تر (یا کوچک‌تر) به ترتیب - argpartition به جای مرتب‌سازی کامل"""
+    values = np.asarray(values, dtype=np.float64)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    keyed = -values if largest else values
+    if k < len(values):
+        candidates = np.argpartition(keyed, k - 1)[:k]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(keyed[candidates], kind="stable")]
+
+
+def compute_top_movers(frame, k):
+    """بیشترین رشد/افت برای هر تایم‌فریم و بیشترین حجم - یک بار برای هر اسکن"""
+    movers = {"volume": top_k_indices(frame["volume"].to_numpy(), k)}
+    for timeframe, field in TIMEFRAME_CHANGE_FIELDS.items():
+        changes = frame[field].to_numpy()
+        movers[timeframe] = {
+            "gainers": top_k_indices(changes, k),
+            "losers": top_k_indices(changes, k, largest=False),
+        }
+    return movers
+
+
+def display_table(rows, timeframe):
+    """جدول نمایشی اسکنر از ردیف‌های یک جدول ستونی"""
+    change_field = TIMEFRAME_CHANGE_FIELDS.get(timeframe, "priceChange1d")
+    return pd.DataFrame({
+        "Symbol": rows["symbol"],
+        "Name": rows["name"],
+        "Price": rows["price"],
+        "Change %": rows[change_field],
+        "Signal": rows["signal_strength"],
+        "Volume (M)": rows["volume"] / 1_000_000,
+        "Anomaly": rows["volume_anomaly"],
+    })
+
+
+def preview_table(raw_coins, timeframe):
+    """جدول ردیف‌های اول اسکنی که هنوز در حال دریافت است (قبل از ساخت ScanSnapshot)"""
+    return display_table(build_scan_frame(normalize_coins(raw_coins)), timeframe)
+
+
+def build_scan_frame(coins):
+    """تبدیل لیست Coin به یک جدول ستونی - فقط یک بار در زمان دریافت اسکن"""
+    return pd.DataFrame({
+        "symbol": [c.symbol for c in coins],
+        "name": [c.name for c in coins],
+        "price": np.fromiter((c.price for c in coins), np.float64, len(coins)),
+        "volume": np.fromiter((c.volume for c in coins), np.float64, len(coins)),
+        "priceChange1h": np.fromiter((c.change_1h for c in coins), np.float64, len(coins)),
+        # تغییر 4 ساعته همیشه در پاسخ سرور نیست - مقدار خالی NaN می‌ماند تا قابل تشخیص باشد
+        "priceChange4h": np.array(
+            [np.nan if c.change_4h is None else c.change_4h for c in coins], dtype=np.float64
+        ),
+        "priceChange1d": np.fromiter((c.change_1d for c in coins), np.float64, len(coins)),
+        "priceChange1w": np.fromiter((c.change_1w for c in coins), np.float64, len(coins)),
+        "signal_strength": np.fromiter((c.signal_strength for c in coins), np.float64, len(coins)),
+        "volume_anomaly": np.fromiter((c.volume_anomaly for c in coins), bool, len(coins)),
+        "trend": [c.trend for c in coins],
+        "volatility_score": np.fromiter((c.volatility_score for c in coins), np.float64, len(coins)),
+    })
+
+
+class ScanSnapshot:
+    """نسخه ستونی یک اسکن به همراه آمار کش‌شده"""
+
+    def __init__(self, scan_data, scan_id=None, top_k=TOP_MOVERS_MAX_K, limit=None, filter_type="volume",
+                 timeframe=None):
+        self.scan_id = scan_id or f"scan-{next(_scan_ids)}"
+        self.created_at = time.time()
+        # رکوردها یک بار نرمال می‌شوند؛ همه مسیرهای رندر از self.coins یا self.frame می‌خوانند
+        self.coins = normalize_coins(scan_data.get("coins", []))
+        self.frame = build_scan_frame(self.coins)
+        # درخواستی که این اسکن با آن دریافت شده (برای پاسخ محلی به محدودیت/مرتب‌سازی‌های دیگر)
+        self.limit = limit
+        self.filter_type = filter_type
+        self.timeframe = timeframe
+        self._sort_orders = {}
+        self.top_k = top_k
+        self.movers = compute_top_movers(self.frame, top_k)
+        self._aggregates = None
+        self._symbol_index = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def with_scan_data(self, scan_data):
+        """snapshot داده به‌روز شده (مثل قیمت‌های زنده) با همان limit، مرتب‌سازی و تایم‌فریم"""
+        return ScanSnapshot(
+            scan_data, top_k=self.top_k, limit=self.limit,
+            filter_type=self.filter_type, timeframe=self.timeframe
+        )
+
+    def aggregates(self):
+        """آمار داشبورد - محاسبه برداری، یک بار برای هر scan_id"""
+        if self._aggregates is None:
+            frame = self.frame
+            self._aggregates = {
+                "total": len(frame),
+                "strong_signals": int((frame["signal_strength"].to_numpy() > STRONG_SIGNAL_THRESHOLD).sum()),
+                "anomalies": int(frame["volume_anomaly"].to_numpy().sum()),
+                "avg_change_1d": float(frame["priceChange1d"].mean()) if len(frame) else 0.0,
+            }
+        return self._aggregates
+
+    @property
+    def symbol_index(self):
+        """ایندکس symbol/نام - یک بار برای هر scan_id ساخته می‌شود"""
+        if self._symbol_index is None:
+            self._symbol_index = SymbolIndex(self.frame["symbol"].tolist(), self.frame["name"].tolist())
+        return self._symbol_index
+
+    def can_answer(self, limit, sort):
+        """آیا این اسکن بدون درخواست جدید برای (limit, sort) کافی است"""
+        # اگر سرور کمتر از limit درخواستی برگردانده، کل بازار در همین اسکن است
+        complete = self.limit is not None and len(self) < self.limit
+        if not complete and limit > (self.limit or len(self)):
+            return False
+        field = SCAN_SORT_FIELDS.get(sort, "volume")
+        return sort == self.filter_type or bool(self.frame[field].notna().any())
+
+    def query(self, limit, sort):
+        """ردیف‌های limit کوین برتر بر اساس sort - مرتب‌سازی یک بار برای هر sort در هر اسکن"""
+        order = self._sort_orders.get(sort)
+        if order is None:
+            values = self.frame[SCAN_SORT_FIELDS.get(sort, "volume")].to_numpy()
+            if sort == self.filter_type and np.isnan(values).all():
+                # فیلد در پاسخ نیست - ترتیب سرور همان مرتب‌سازی درخواستی است
+                order = np.arange(len(values))
+            else:
+                order = np.argsort(-values, kind="stable")
+            self._sort_orders[sort] = order
+        return order[:limit]
+
+    def table(self, timeframe, start=0, stop=None, positions=None):
+        """جدول نمایشی یک بازه از اسکن برای تایم‌فریم داده شده"""
+        rows = self.frame.iloc[start:stop] if positions is None else self.frame.iloc[positions[start:stop]]
+        return display_table(rows, timeframe)
+
+    def movers_table(self, kind, timeframe="24h", k=10):
+        """جدول top-k از نتایج محاسبه شده (kind: gainers, losers یا volume)"""
+        if kind == "volume":
+            positions = self.movers["volume"]
+        else:
+            timeframe = timeframe if timeframe in self.movers else "24h"
+            positions = self.movers[timeframe][kind]
+        change_field = TIMEFRAME_CHANGE_FIELDS.get(timeframe, "priceChange1d")
+        rows = self.frame.iloc[positions[:k]]
+        return pd.DataFrame({
+            "Symbol": rows["symbol"].to_numpy(),
+            "Name": rows["name"].to_numpy(),
+            "Price": rows["price"].to_numpy(),
+            "Change %": rows[change_field].to_numpy(),
+            "Volume (M)": rows["volume"].to_numpy() / 1_000_000,
+        })
@@ -0,0 +1,167 @@
+import heapq
+import itertools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from config.constants import SCHEDULER_DEFAULT_RATE, SCHEDULER_RATES
+from modules.metrics import LatencyHistogram
+
+# اولویت درخواست‌ها: عدد کمتر زودتر
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class DeferredError(Exception):
+    """درخواست ارسال نشد: endpoint تا بعد از مهلت فراخوانی متوقف است (Retry-After) یا صف طولانی است"""
+
+
+def parse_retry_after(value):
+    """مقدار هدر Retry-After (ثانیه یا تاریخ HTTP) به ثانیه - None اگر نامعتبر باشد"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """محدودیت نرخ: rate توکن در ثانیه با ظرفیت burst"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """برداشتن یک توکن - خروجی 0 در صورت موفقیت یا زمان انتظار تا توکن بعدی"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class EndpointQueue:
+    def __init__(self, rate, burst):
+        self.bucket = TokenBucket(rate, burst)
+        self.waiters = []
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.waits = {priority: LatencyHistogram() for priority in PRIORITY_NAMES}
+
+
+class RequestScheduler:
+    """
+    زمان‌بندی درخواست‌ها به سرور: token bucket برای هر endpoint و صف اولویت‌دار
+    (درخواست‌های تعاملی کاربر جلوتر از پیش‌واکشی پس‌زمینه) با رعایت Retry-After
+    """
+
+    def __init__(self, rates=None, default_rate=(5.0, 10)):
+        self.rates = rates or {}
+        self.default_rate = default_rate
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._seq = itertools.count()
+
+    def _queue(self, endpoint):
+        if endpoint not in self._queues:
+            self._queues[endpoint] = EndpointQueue(*self.rates.get(endpoint, self.default_rate))
+        return self._queues[endpoint]
+
+    def acquire(self, endpoint, priority=INTERACTIVE, timeout=None):
+        """
+        انتظار تا نوبت و توکن این درخواست - خروجی زمان انتظار به ثانیه؛
+        DeferredError اگر تا timeout ثانیه نوبت نرسد (یا توقف Retry-After بیشتر از آن باشد)
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            queue = self._queue(endpoint)
+            if deadline is not None and queue.blocked_until > deadline:
+                # منتظر ماندن بی‌فایده است - فراخواننده سراغ داده کش‌شده می‌رود
+                raise DeferredError(
+                    f"{endpoint} deferred by upstream for {queue.blocked_until - started:.0f}s"
+                )
+            entry = (priority, next(self._seq))
+            heapq.heappush(queue.waiters, entry)
+            try:
+                while True:
+                    wait = None
+                    if queue.waiters[0] == entry:
+                        wait = queue.blocked_until - time.monotonic()
+                        if wait <= 0:
+                            wait = queue.bucket.take()
+                            if wait <= 0:
+                                break
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or (queue.waiters[0] == entry and queue.blocked_until > deadline):
+                            raise DeferredError(f"{endpoint} request queue wait exceeded {timeout:.1f}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    # فقط سر صف منتظر توکن می‌ماند؛ بقیه تا خروج او منتظر می‌مانند
+                    self._cond.wait(wait)
+            finally:
+                queue.waiters.remove(entry)
+                heapq.heapify(queue.waiters)
+                self._cond.notify_all()
+            waited = time.monotonic() - started
+            queue.waits[priority].record(waited)
+        return waited
+
+    def defer(self, endpoint, seconds):
+        """توقف ارسال به endpoint تا seconds ثانیه (پاسخ 429/503 با Retry-After)"""
+        with self._cond:
+            queue = self._queue(endpoint)
+            queue.blocked_until = max(queue.blocked_until, time.monotonic() + seconds)
+            queue.throttled += 1
+            self._cond.notify_all()
+
+    def rows(self):
+        """وضعیت صف هر endpoint برای پنل عیب‌یابی (زمان‌ها به میلی‌ثانیه)"""
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+
+        now = time.monotonic()
+        with self._cond:
+            rows = []
+            for endpoint, queue in sorted(self._queues.items()):
+                waiting = [priority for priority, _ in queue.waiters]
+                interactive = queue.waits[INTERACTIVE]
+                background = queue.waits[BACKGROUND]
+                rows.append({
+                    "endpoint": endpoint,
+                    "rate /s": queue.bucket.rate,
+                    "queued interactive": waiting.count(INTERACTIVE),
+                    "queued background": waiting.count(BACKGROUND),
+                    "wait p95 interactive ms": ms(interactive.percentile(95)),
+                    "wait p95 background ms": ms(background.percentile(95)),
+                    "throttled": queue.throttled,
+                    "blocked s": round(max(queue.blocked_until - now, 0.0), 1),
+                })
+            return rows
+
+    def queue_depth(self):
+        with self._cond:
+            return sum(len(queue.waiters) for queue in self._queues.values())
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def shared_scheduler(base_url):
+    """یک RequestScheduler مشترک برای هر آدرس سرور در کل پروسه"""
+    with _schedulers_lock:
+        if base_url not in _schedulers:
+            _schedulers[base_url] = RequestScheduler(SCHEDULER_RATES, SCHEDULER_DEFAULT_RATE)
+        return _schedulers[base_url]
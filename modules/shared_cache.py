@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config.constants import SHARED_CACHE_SIZE, SHARED_CACHE_TTLS
+from modules.metrics import registry as default_metrics
+
+
+class _Call:
+    """درخواست در حال اجرا که درخواست‌های یکسان همزمان منتظر نتیجه آن می‌مانند"""
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SharedCache:
+    """
+    کش پاسخ‌های سرور مشترک بین همه sessionها با single-flight:
+    درخواست‌های یکسان همزمان فقط یک درخواست به سرور می‌فرستند.
+    مقادیر کش‌شده مشترک‌اند و نباید تغییر داده شوند (فقط خواندنی).
+    """
+
+    def __init__(self, ttls, default_ttl=30, capacity=1024, metrics=None):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.capacity = capacity
+        self.metrics = metrics or default_metrics
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._derived = OrderedDict()
+        self.coalesced = 0
+
+    def _store(self, cache_key, value):
+        self._entries[cache_key] = (value, time.time())
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, kind, key, ttl=None):
+        """مقدار تازه کش‌شده یا None"""
+        ttl = self.ttls.get(kind, self.default_ttl) if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None and time.time() - entry[1] < ttl:
+                return entry[0]
+        return None
+
+    def fetch(self, kind, key, fetch, ttl=None, cache_if=None, priority=0):
+        """مقدار تازه از کش، یا یک فراخوانی fetch() مشترک برای همه درخواست‌های همزمان"""
+        cache_key = (kind, key)
+        value = self.get(kind, key, ttl)
+        self.metrics.record_cache(f"shared_{kind}", value is not None)
+        if value is not None:
+            return value
+
+        with self._lock:
+            call = self._in_flight.get(cache_key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[cache_key] = _Call(priority)
+            elif call.priority > priority:
+                # درخواست فوری‌تر پشت درخواست پس‌زمینه در صف نمی‌ماند
+                call = None
+            else:
+                self.coalesced += 1
+
+        if call is None:
+            value = fetch()
+            if value is not None and (cache_if is None or cache_if(value)):
+                with self._lock:
+                    self._store(cache_key, value)
+            return value
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(cache_key) is call:
+                    del self._in_flight[cache_key]
+                keep = call.result is not None and (cache_if is None or cache_if(call.result))
+                if call.error is None and keep:
+                    self._store(cache_key, call.result)
+            call.done.set()
+        return call.result
+
+    def derive(self, value, name, build):
+        """شیء مشتق (مثل ScanSnapshot) مشترک برای یک مقدار کش‌شده - یک بار ساخته می‌شود"""
+        derived_key = (id(value), name)
+        with self._lock:
+            entry = self._derived.get(derived_key)
+            # خود مقدار نگه داشته می‌شود تا id آن تا زمان حذف از کش تکراری نشود
+            if entry is not None and entry[0] is value:
+                self._derived.move_to_end(derived_key)
+                return entry[1]
+        derived = build()
+        with self._lock:
+            self._derived[derived_key] = (value, derived)
+            while len(self._derived) > self.capacity:
+                self._derived.popitem(last=False)
+        return derived
+
+    def invalidate(self, kind, key):
+        with self._lock:
+            self._entries.pop((kind, key), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._derived.clear()
+            self.coalesced = 0
+
+    def status(self):
+        """تعداد ورودی‌ها، درخواست‌های در حال اجرا و درخواست‌های ادغام شده"""
+        with self._lock:
+            return len(self._entries), len(self._in_flight), self.coalesced
+
+
+# کش مشترک کل پروسه
+shared_cache = SharedCache(SHARED_CACHE_TTLS, capacity=SHARED_CACHE_SIZE)
@@ -0,0 +1,240 @@
+import math
+import threading
+from collections import deque
+
+
+class EMA:
+    """میانگین متحرک نمایی - O(1) برای هر tick"""
+
+    def __init__(self, period=None, alpha=None):
+        self.alpha = alpha if alpha is not None else 2 / (period + 1)
+        self.value = None
+
+    def update(self, x):
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class MACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.line = None
+
+    def update(self, price):
+        self.line = self.fast.update(price) - self.slow.update(price)
+        self.signal.update(self.line)
+        return self.line
+
+    @property
+    def histogram(self):
+        if self.line is None:
+            return None
+        return self.line - self.signal.value
+
+
+class WilderRSI:
+    def __init__(self, period=14):
+        self.period = period
+        self.gain = EMA(alpha=1 / period)
+        self.loss = EMA(alpha=1 / period)
+        self.prev = None
+        self.value = None
+
+    def update(self, price):
+        if self.prev is not None:
+            delta = price - self.prev
+            avg_gain = self.gain.update(max(delta, 0.0))
+            avg_loss = self.loss.update(max(-delta, 0.0))
+            self.value = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+        self.prev = price
+        return self.value
+
+
+class RollingBollinger:
+    """باند بولینگر با جمع و جمع مربعات غلتان"""
+
+    def __init__(self, period=20, width=2):
+        self.period = period
+        self.width = width
+        self.window = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, price):
+        self.window.append(price)
+        self.total += price
+        self.total_sq += price * price
+        if len(self.window) > self.period:
+            old = self.window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        return self.bands
+
+    @property
+    def bands(self):
+        count = len(self.window)
+        if count < self.period:
+            return None
+        mean = self.total / count
+        std = math.sqrt(max(self.total_sq / count - mean * mean, 0.0))
+        return mean + self.width * std, mean, mean - self.width * std
+
+
+class ATR:
+    def __init__(self, period=14):
+        self.average = EMA(alpha=1 / period)
+        self.prev_close = None
+        self.value = None
+
+    def update(self, close, high=None, low=None):
+        high = close if high is None else high
+        low = close if low is None else low
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.value = self.average.update(tr)
+        return self.value
+
+
+class OBV:
+    def __init__(self):
+        self.prev = None
+        self.value = 0.0
+
+    def update(self, price, volume):
+        if self.prev is not None:
+            if price > self.prev:
+                self.value += volume
+            elif price < self.prev:
+                self.value -= volume
+        self.prev = price
+        return self.value
+
+
+class Stochastic:
+    """%K و Williams %R با صف‌های یکنوا برای کمینه/بیشینه پنجره (O(1) سرشکن)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.lows = deque()
+        self.highs = deque()
+        self.k = None
+        self.williams_r = None
+
+    def update(self, close, high=None, low=None):
+        high = close if high is None else high
+        low = close if low is None else low
+        index = self.count
+        self.count += 1
+
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((index, low))
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((index, high))
+
+        expired = index - self.period
+        if self.lows[0][0] <= expired:
+            self.lows.popleft()
+        if self.highs[0][0] <= expired:
+            self.highs.popleft()
+
+        if self.count >= self.period:
+            lowest, highest = self.lows[0][1], self.highs[0][1]
+            span = highest - lowest
+            if span > 0:
+                self.k = 100 * (close - lowest) / span
+                self.williams_r = -100 * (highest - close) / span
+        return self.k
+
+
+class SymbolIndicators:
+    """وضعیت فشرده اندیکاتورهای یک کوین"""
+
+    def __init__(self):
+        self.ticks = 0
+        self.last_price = None
+        self.last_ts = None
+        self.macd = MACD()
+        self.rsi = WilderRSI()
+        self.bollinger = RollingBollinger()
+        self.atr = ATR()
+        self.obv = OBV()
+        self.stochastic = Stochastic()
+
+    def update(self, price, volume=0.0):
+        # volume حجم معاملات همین tick است - حجم 24 ساعته غلتان برای OBV معنی ندارد
+        self.ticks += 1
+        self.last_price = price
+        self.macd.update(price)
+        self.rsi.update(price)
+        self.bollinger.update(price)
+        self.atr.update(price)
+        self.obv.update(price, volume)
+        self.stochastic.update(price)
+
+    def snapshot(self):
+        """مقادیر فعلی با کلیدهای مشابه technical_indicators سرور"""
+        values = {
+            "rsi": self.rsi.value,
+            "macd": self.macd.line,
+            "macd_signal": self.macd.signal.value,
+            "macd_histogram": self.macd.histogram,
+            "stochastic_k": self.stochastic.k,
+            "williams_r": self.stochastic.williams_r,
+            "atr": self.atr.value,
+            "obv": self.obv.value,
+        }
+        bands = self.bollinger.bands
+        if bands:
+            values["bollinger_upper"], values["bollinger_middle"], values["bollinger_lower"] = bands
+        return {key: value for key, value in values.items() if value is not None}
+
+
+class IndicatorBook:
+    """دفتر اندیکاتورهای زنده همه کوین‌ها"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def on_tick(self, symbol, price, volume=None, ts=None):
+        """
+        اعمال یک tick قیمت - volume حجم معاملات همان tick است
+        tickهای با زمان قدیمی‌تر یا مساوی آخرین tick آن کوین نادیده گرفته می‌شوند
+        """
+        if not symbol or not price:
+            return False
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                state = self._states[symbol] = SymbolIndicators()
+            if ts is not None:
+                # زمان میلی‌ثانیه مثل scan_timestamp به ثانیه تبدیل می‌شود
+                ts = float(ts) / 1000 if float(ts) > 1e12 else float(ts)
+                if state.last_ts is not None and ts <= state.last_ts:
+                    return False
+                state.last_ts = ts
+            state.update(float(price), float(volume) if volume else 0.0)
+        return True
+
+    def ingest_scan(self, coins, scanned_at):
+        """
+        اعمال قیمت Coinهای یک اسکن با زمان اسکن - بدون حجم (حجم اسکن 24 ساعته است)
+        خروجی: تعداد کوین‌هایی که tick جدیدتری از اسکن نداشتند
+        """
+        return sum(self.on_tick(coin.symbol, coin.price, ts=scanned_at) for coin in coins)
+
+    def snapshot(self, symbol):
+        """(مقادیر فعلی، تعداد tick) برای یک کوین"""
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                return {}, 0
+            return state.snapshot(), state.ticks
@@ -0,0 +1,63 @@
+import bisect
+
+
+class SymbolIndex:
+    """ایندکس symbol -> ردیف و جستجوی پیشوندی/فازی روی symbol و نام"""
+
+    def __init__(self, symbols, names):
+        self.symbols = list(symbols)
+        self.names = list(names)
+        self.by_symbol = {}
+        for position, symbol in enumerate(self.symbols):
+            self.by_symbol.setdefault(symbol, position)
+
+        # آرایه مرتب کلیدها برای جستجوی پیشوندی با bisect
+        entries = []
+        for position, (symbol, name) in enumerate(zip(self.symbols, self.names)):
+            entries.append((str(symbol).lower(), 0, position))
+            name = str(name or "").lower()
+            entries.append((name, 1, position))
+            # هر کلمه نام هم قابل جستجو است (مثلاً "cash" در "Bitcoin Cash")
+            for word in name.split()[1:]:
+                entries.append((word, 1, position))
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._entries = entries
+        self._haystack = [f"{str(s).lower()} {str(n or '').lower()}" for s, n in zip(self.symbols, self.names)]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def get(self, symbol):
+        """ردیف یک symbol در O(1) (None اگر وجود نداشته باشد)"""
+        return self.by_symbol.get(symbol)
+
+    def search(self, query, limit=50):
+        """ردیف‌های منطبق: اول تطابق پیشوندی symbol، بعد نام، بعد تطابق زیررشته"""
+        query = query.strip().lower()
+        if not query:
+            return list(range(min(limit, len(self.symbols))))
+
+        symbol_hits, name_hits = [], []
+        # بازه کلیدهای با این پیشوند با دو bisect - بدون کپی لیست ورودی‌ها در هر کلید
+        start = bisect.bisect_left(self._keys, query)
+        stop = bisect.bisect_left(self._keys, query[:-1] + chr(ord(query[-1]) + 1), start)
+        for index in range(start, stop):
+            _, kind, position = self._entries[index]
+            (symbol_hits if kind == 0 else name_hits).append(position)
+
+        results, seen = [], set()
+        for position in sorted(symbol_hits, key=lambda p: (len(self.symbols[p]), p)) + sorted(name_hits):
+            if position not in seen:
+                seen.add(position)
+                results.append(position)
+                if len(results) >= limit:
+                    return results
+
+        # fallback فازی: زیررشته در symbol یا نام
+        for position, text in enumerate(self._haystack):
+            if position not in seen and query in text:
+                results.append(position)
+                if len(results) >= limit:
+                    break
+        return results
@@ -1,78 +1,120 @@
+import pandas as pd
 import streamlit as st
+from config.constants import TECHNICAL_INDICATOR_SOURCE, TECHNICAL_HISTORY_TIMEFRAME
+from modules.fragment_cache import fragments
+from modules.indicators import (
+    candles_from_history,
+    compute_indicators,
+    compute_support_resistance,
+    compare_with_server,
+)
 
 class TechnicalAnalysisUI:
-    def __init__(self, api_client):
+    def __init__(self, api_client, prefetcher=None, indicator_book=None):
         self.api_client = api_client
+        self.prefetcher = prefetcher
+        self.indicator_book = indicator_book
     
     def render_technical_dashboard(self, coin):
         """داشبورد تحلیل تکنیکال با داده‌های واقعی"""
         st.markdown(f"""
         <div class="glass-card">
-            <h2 style="color: #FFFFFF; margin: 0;">📈 Technical Analysis - {coin.get('symbol', 'N/A')}</h2>
+            <h2 style="color: #FFFFFF; margin: 0;">📈 Technical Analysis - {coin.symbol}</h2>
         </div>
         """, unsafe_allow_html=True)
         
-        # دریافت داده‌های تکنیکال از سرور
-        technical_data = self.get_coin_technical(coin['symbol'])
+        # اندیکاتورهای محلی از تاریخچه قیمت - بدون درخواست technical برای هر کوین
+        technical_data = None
+        if TECHNICAL_INDICATOR_SOURCE == "local":
+            technical_data = self.get_local_technical(coin)
+        
+        if technical_data is None:
+            technical_data = self.get_coin_technical(coin.symbol)
+            if not (technical_data and technical_data.get("success")):
+                technical_data = self.get_local_technical(coin)
         
         if technical_data and technical_data.get("success"):
-            st.success("✅ Advanced technical data loaded!")
+            source = "local engine" if technical_data.get("source") == "local" else "server"
+            st.success(f"✅ Advanced technical data loaded ({source})")
             self.render_advanced_technical(technical_data, coin)
+            self.render_indicator_validation(technical_data, coin.symbol)
         else:
             st.warning("⚠️ Using basic analysis data")
             self.render_basic_technical(coin)
+        
+        self.render_live_indicators(coin.symbol)
     
-    def get_coin_technical(self, symbol):
-        """دریافت تحلیل تکنیکال برای یک کوین"""
-        try:
-            # نمایش اطلاعات دیباگ
-            st.write(f"🔍 Fetching technical data for: {symbol}")
-        
-            # ساخت URL کامل برای دیباگ
-            api_url = f"{self.base_url}/coin/{symbol}/technical"
-            st.write(f"🌐 API URL: {api_url}")
-        
-            # درخواست به API
-            response = self.session.get(api_url, timeout=self.timeout)
-            self.request_count += 1
-        
-            st.write(f"📡 Response Status: {response.status_code}")
-        
-            # بررسی status code
-            if response.status_code != 200:
-                st.error(f"❌ HTTP Error: {response.status_code}")
-                return None
-        
-            # تبدیل به JSON
-            data = response.json()
-        
-            # دیباگ کامل پاسخ
-            st.write("🔧 DEBUG - API Response:")
-            st.write(f"- Success: {data.get('success')}")
-            st.write(f"- Error: {data.get('error')}")
-            st.write(f"- Has indicators: {bool(data.get('technical_indicators'))}")
-            st.write(f"- Has support/resistance: {bool(data.get('support_resistance'))}")
-            st.write(f"- Has vortex analysis: {bool(data.get('vortexai_analysis'))}")
-        
-            if data.get('success'):
-                st.success("✅ API returned successful technical data!")
-                return data
-            else:
-                st.error(f"❌ API returned error: {data.get('error')}")
-                return None
-            
-        except requests.exceptions.Timeout:
-            st.error("❌ API request timeout")
-            return None
-        except requests.exceptions.ConnectionError:
-            st.error("❌ Connection error - server may be down")
-            return None
-        except requests.exceptions.RequestException as e:
-            st.error(f"❌ Request error: {str(e)}")
-            return None
-        except Exception as e:
-            st.error(f"❌ Unexpected error: {str(e)}")
+    def get_local_technical(self, coin):
+        """محاسبه اندیکاتورها به صورت محلی از کندل‌های get_coin_history"""
+        if self.api_client.candle_store is not None:
+            candles = pd.DataFrame(self.api_client.get_history_candles(coin.symbol, TECHNICAL_HISTORY_TIMEFRAME))
+        else:
+            history = self.api_client.get_coin_history(coin.symbol, TECHNICAL_HISTORY_TIMEFRAME)
+            candles = candles_from_history(history)
+        indicators = compute_indicators(candles)
+        if not indicators:
             return None
+        
+        # تحلیل کامل VortexAI فقط در سرور است - اگر در کش نباشد خلاصه‌ای از تحلیل اسکن کوین
+        server_data = self.prefetcher.get(coin.symbol) if self.prefetcher else None
+        vortex_analysis = (server_data or {}).get('vortexai_analysis') or self.scan_vortex_analysis(coin)
+        return {
+            "success": True,
+            "source": "local",
+            "current_price": float(candles["close"].iloc[-1]),
+            "technical_indicators": indicators,
+            "support_resistance": compute_support_resistance(candles),
+            "vortexai_analysis": vortex_analysis,
+        }
+    
+    @staticmethod
+    def scan_vortex_analysis(coin):
+        """سیگنال VortexAI از فیلدهای VortexAI_analysis اسکن (trend، volatility_score و signal_strength)"""
+        sentiment = {"up": "BULLISH", "down": "BEARISH"}.get(coin.trend, "NEUTRAL")
+        if coin.volatility_score >= 0.66:
+            risk_level = "HIGH"
+        elif coin.volatility_score >= 0.33:
+            risk_level = "MEDIUM"
+        else:
+            risk_level = "LOW"
+        return {
+            "market_sentiment": sentiment,
+            "risk_level": risk_level,
+            "prediction_confidence": min(max(coin.signal_strength / 10, 0.0), 1.0),
+            "top_opportunities": [],
+        }
+    
+    def render_indicator_validation(self, technical_data, symbol):
+        """مقایسه اندیکاتورهای محلی با مقادیر سرور - درخواست سرور فقط به درخواست کاربر"""
+        if technical_data.get("source") != "local" or not self.prefetcher:
+            return
+        server_data = self.prefetcher.get(symbol)
+        if not server_data:
+            if st.button("🔬 Compare with server indicators", key=f"validate_{symbol}"):
+                server_data = self.get_coin_technical(symbol)
+            if not server_data:
+                return
+        
+        rows = compare_with_server(
+            technical_data['technical_indicators'],
+            server_data.get('technical_indicators', {})
+        )
+        if rows:
+            matched = sum(row['match'] for row in rows)
+            with st.expander(f"🔬 Local vs server indicators ({matched}/{len(rows)} match)"):
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+    
+    def get_coin_technical(self, symbol):
+        """دریافت تحلیل تکنیکال - اول از کش پیش‌واکشی، در غیر این صورت از سرور"""
+        if self.prefetcher:
+            cached = self.prefetcher.get(symbol)
+            if cached:
+                return cached
+
+        data = self.api_client.get_coin_technical(symbol)
+        if data and self.prefetcher:
+            self.prefetcher.put(symbol, data)
+        return data
     
     def render_advanced_technical(self, technical_data, coin):
         """نمایش تحلیل تکنیکال پیشرفته"""
@@ -106,11 +148,11 @@ class TechnicalAnalysisUI:
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            price = current_price or coin.get('price') or coin.get('realtime_price') or 0
+            price = current_price or coin.price
             self.render_metric_glass("Current Price", f"${price:,.2f}")
         
         with col2:
-            change_24h = coin.get('priceChange1d', 0)
+            change_24h = coin.change_1d
             change_color = "text-success" if change_24h >= 0 else "text-error"
             st.markdown(f"""
             <div class="glass-metric">
@@ -122,7 +164,7 @@ class TechnicalAnalysisUI:
             """, unsafe_allow_html=True)
         
         with col3:
-            volume = coin.get('volume') or 0
+            volume = coin.volume
             self.render_metric_glass("24H Volume", f"${volume/1000000:,.1f}M")
     
     def render_main_indicators(self, indicators):
@@ -346,10 +388,52 @@ class TechnicalAnalysisUI:
         with col4:
             self.render_metric_glass("CCI", f"{indicators.get('cci', 0):.1f}")
     
+    def render_live_indicators(self, symbol):
+        """نمایش اندیکاتورهای زنده (حالت افزایشی - بدون محاسبه مجدد)"""
+        if not self.indicator_book:
+            return
+        live, ticks = self.indicator_book.snapshot(symbol)
+        if ticks < 2:
+            return
+        
+        st.markdown(f"""
+        <div class="glass-card">
+            <h3 style="color: #FFFFFF; margin: 0 0 1rem 0;">⚡ Live Indicators</h3>
+            <div class="text-secondary" style="font-size: 0.8rem;">{ticks} ticks from realtime scan prices</div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            rsi = live.get('rsi')
+            self.render_metric_glass("RSI", f"{rsi:.1f}" if rsi is not None else "warming up")
+        
+        with col2:
+            self.render_metric_glass("MACD", f"{live.get('macd', 0):.3f}")
+        
+        with col3:
+            stoch_k = live.get('stochastic_k')
+            self.render_metric_glass("Stochastic %K", f"{stoch_k:.1f}" if stoch_k is not None else "warming up")
+        
+        with col4:
+            self.render_metric_glass("OBV", f"{live.get('obv', 0):,.0f}")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            upper = live.get('bollinger_upper')
+            self.render_metric_glass("Bollinger Upper", f"${upper:,.2f}" if upper is not None else "warming up")
+        
+        with col2:
+            lower = live.get('bollinger_lower')
+            self.render_metric_glass("Bollinger Lower", f"${lower:,.2f}" if lower is not None else "warming up")
+        
+        with col3:
+            self.render_metric_glass("ATR", f"{live.get('atr', 0):.3f}")
+    
     def render_basic_technical(self, coin):
         """نمایش تحلیل تکنیکال پایه (fallback)"""
-        vortex_data = coin.get('VortexAI_analysis', {})
-        
         st.markdown("""
         <div class="glass-card">
             <h3 style="color: #FFFFFF; margin: 0 0 1rem 0;">🧠 Basic VortexAI Analysis</h3>
@@ -359,10 +443,10 @@ class TechnicalAnalysisUI:
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            self.render_metric_glass("Signal Strength", f"{vortex_data.get('signal_strength', 0):.1f}/10")
+            self.render_metric_glass("Signal Strength", f"{coin.signal_strength:.1f}/10")
         
         with col2:
-            trend = vortex_data.get('trend', 'neutral')
+            trend = coin.trend
             trend_color = "text-success" if trend == "up" else "text-error" if trend == "down" else "text-primary"
             st.markdown(f"""
             <div class="glass-metric">
@@ -374,10 +458,10 @@ class TechnicalAnalysisUI:
             """, unsafe_allow_html=True)
         
         with col3:
-            self.render_metric_glass("Volatility", f"{vortex_data.get('volatility_score', 0):.3f}")
+            self.render_metric_glass("Volatility", f"{coin.volatility_score:.3f}")
         
         with col4:
-            anomaly = vortex_data.get('volume_anomaly', False)
+            anomaly = coin.volume_anomaly
             anomaly_color = "text-error" if anomaly else "text-success"
             anomaly_text = "DETECTED" if anomaly else "NORMAL"
             st.markdown(f"""
@@ -391,9 +475,10 @@ class TechnicalAnalysisUI:
     
     def render_metric_glass(self, title, value):
         """نمایش متریک با طراحی شیشه‌ای"""
-        st.markdown(f"""
+        html = fragments.render("metric_glass", (title, value), lambda: f"""
         <div class="glass-metric">
             <div class="text-secondary" style="font-size: 0.8rem;">{title}</div>
             <div class="text-primary" style="font-size: 1.1rem; margin: 0.5rem 0; font-weight: bold;">{value}</div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
+        st.markdown(html, unsafe_allow_html=True)
@@ -0,0 +1,68 @@
+import pytest
+
+from modules.alerts import AlertEngine, AlertRule
+from modules.scan_store import ScanSnapshot
+
+
+class InlineExecutor:
+    """اجرای همزمان کارهای worker برای تست"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def snapshot(changes):
+    return ScanSnapshot({"coins": [
+        {"symbol": symbol, "price": 1.0, "priceChange1d": change} for symbol, change in changes.items()
+    ]})
+
+
+@pytest.fixture
+def engine():
+    return AlertEngine(InlineExecutor())
+
+
+def test_rule_fires_for_matching_coins(engine):
+    engine.add_rule(AlertRule("priceChange1d", ">", 5, cooldown=0))
+    engine.submit(snapshot({"BTC": 8.0, "ETH": 1.0, "SOL": 6.0}))
+    assert sorted(alert["coin"] for alert in engine.recent()) == ["BTC", "SOL"]
+    assert engine.evaluated_rows == 3
+
+
+def test_only_changed_coins_are_evaluated(engine):
+    engine.add_rule(AlertRule("priceChange1d", ">", 5, cooldown=0))
+    engine.submit(snapshot({"BTC": 8.0, "ETH": 1.0}))
+    engine.submit(snapshot({"BTC": 8.0, "ETH": 7.0}))
+    assert engine.evaluated_rows == 1
+    assert [alert["coin"] for alert in engine.recent()] == ["ETH", "BTC"]
+
+
+def test_cooldown_suppresses_repeat_alerts(engine):
+    engine.add_rule(AlertRule("priceChange1d", ">", 5, cooldown=900))
+    engine.submit(snapshot({"BTC": 8.0}))
+    engine.submit(snapshot({"BTC": 9.0}))
+    assert len(engine.recent()) == 1
+
+
+def test_new_rule_reevaluates_all_coins(engine):
+    engine.add_rule(AlertRule("priceChange1d", ">", 5, cooldown=0))
+    engine.submit(snapshot({"BTC": 8.0, "ETH": 1.0}))
+    engine.add_rule(AlertRule("priceChange1d", "<", 2, cooldown=0))
+    engine.submit(snapshot({"BTC": 8.0, "ETH": 1.0}))
+    assert engine.evaluated_rows == 2
+    assert [alert["coin"] for alert in engine.recent()] == ["ETH", "BTC", "BTC"]
+
+
+def test_evaluation_error_is_recorded(engine, monkeypatch):
+    engine.add_rule(AlertRule("priceChange1d", ">", 5, cooldown=0))
+
+    def fail(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(engine, "_evaluate", fail)
+    engine.submit(snapshot({"BTC": 8.0}))
+    assert "RuntimeError: boom" in engine.last_error
+    monkeypatch.undo()
+    engine.submit(snapshot({"BTC": 8.0}))
+    assert engine.last_error is None
+    assert len(engine.recent()) == 1
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from modules.candle_store import CANDLE_DTYPE, CandleStore, records_from_history
+
+
+def candles(times, close=1.0):
+    records = np.zeros(len(times), dtype=CANDLE_DTYPE)
+    records["time"] = times
+    records["close"] = close
+    return records
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+
+def test_append_and_read_range(store):
+    assert store.append("btc", "1h", candles([10, 20, 30, 40])) == 4
+    assert store.last_timestamp("BTC", "1h") == 40
+    assert list(store.read("BTC", "1h")["time"]) == [10, 20, 30, 40]
+    assert list(store.read("BTC", "1h", start=15, end=30)["time"]) == [20, 30]
+    assert len(store.read("ETH", "1h")) == 0
+
+
+def test_append_skips_older_candles(store):
+    store.append("BTC", "1h", candles([10, 20, 30]))
+    assert store.append("BTC", "1h", candles([10, 20])) == 0
+    assert store.append("BTC", "1h", candles([20, 40, 50])) == 2
+    assert list(store.read("BTC", "1h")["time"]) == [10, 20, 30, 40, 50]
+
+
+def test_append_replaces_forming_candle(store):
+    store.append("BTC", "1h", candles([10, 20, 30], close=1.0))
+    assert store.append("BTC", "1h", candles([30, 40], close=2.0)) == 2
+    series = store.read("BTC", "1h")
+    assert list(series["time"]) == [10, 20, 30, 40]
+    assert list(series["close"]) == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_append_keeps_latest_duplicate(store):
+    batch = candles([10, 20, 20])
+    batch["close"] = [1.0, 2.0, 3.0]
+    assert store.append("BTC", "1h", batch) == 2
+    assert list(store.read("BTC", "1h")["close"]) == [1.0, 3.0]
+
+
+def test_records_from_history_sorts_and_converts_ms():
+    payload = {"data": [
+        {"time": 1_700_000_060_000, "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 10},
+        {"time": 1_700_000_000, "open": 1, "high": 2, "low": 0.5, "close": 1.0, "volume": 10},
+    ]}
+    records = records_from_history(payload)
+    assert list(records["time"]) == [1_700_000_000, 1_700_000_060]
+    assert list(records["close"]) == [1.0, 1.5]
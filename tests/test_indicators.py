@@ -0,0 +1,70 @@
+import math
+
+import pandas as pd
+import pytest
+
+from modules.indicators import candles_from_history, compare_with_server, compute_indicators
+
+
+def linear_candles(count):
+    """کندل‌های صعودی خطی با close = 1..count و high = low = close"""
+    close = [float(value) for value in range(1, count + 1)]
+    return pd.DataFrame({
+        "time": range(count), "open": close, "high": close, "low": close, "close": close,
+        "volume": [1.0] * count,
+    })
+
+
+def test_linear_series_known_values():
+    values = compute_indicators(linear_candles(300))
+    # بدون کندل نزولی RSI و %K در سقف هستند
+    assert values["rsi"] == 100.0
+    assert values["stochastic_k"] == 100.0
+    assert values["williams_r"] == 0.0
+    # تاخیر EMA با span=n روی سری خطی (n-1)/2 است: MACD = 12.5 - 5.5
+    assert values["macd"] == pytest.approx(7.0)
+    assert values["macd_signal"] == pytest.approx(7.0)
+    assert values["macd_histogram"] == pytest.approx(0.0, abs=1e-9)
+    # 20 عدد صحیح متوالی: میانگین 290.5 و انحراف معیار sqrt((20^2 - 1) / 12)
+    std = math.sqrt(399 / 12)
+    assert values["bollinger_middle"] == pytest.approx(290.5)
+    assert values["bollinger_upper"] == pytest.approx(290.5 + 2 * std)
+    assert values["bollinger_lower"] == pytest.approx(290.5 - 2 * std)
+    assert values["moving_avg_20"] == pytest.approx(290.5)
+    assert values["moving_avg_50"] == pytest.approx(275.5)
+    assert values["atr"] == pytest.approx(1.0)
+    assert values["adx"] == pytest.approx(100.0)
+    assert values["obv"] == 299.0
+    # انحراف از میانگین 9.5 و میانگین قدر مطلق انحراف 5
+    assert values["cci"] == pytest.approx(9.5 / (0.015 * 5))
+
+
+def test_short_history_omits_incomplete_windows():
+    values = compute_indicators(linear_candles(30))
+    assert "moving_avg_50" not in values
+    assert values["moving_avg_20"] == pytest.approx(20.5)
+    assert compute_indicators(linear_candles(1)) == {}
+
+
+def test_flat_series_has_no_momentum():
+    candles = linear_candles(60)
+    for column in ("open", "high", "low", "close"):
+        candles[column] = 10.0
+    values = compute_indicators(candles)
+    assert values["macd"] == 0.0
+    assert values["obv"] == 0.0
+    assert values["bollinger_upper"] == values["bollinger_lower"] == 10.0
+    # بازه صفر: %K تعریف نشده است
+    assert "stochastic_k" not in values
+
+
+def test_candles_from_history_aliases_and_close_only():
+    frame = candles_from_history({"prices": [{"t": 1, "price": 5}, {"t": 2, "c": 6, "h": 7, "v": 3}]})
+    assert list(frame["close"]) == [5.0, 6.0]
+    assert list(frame["high"]) == [5.0, 7.0]
+    assert list(frame["volume"]) == [0.0, 3.0]
+
+
+def test_compare_with_server_tolerance():
+    rows = compare_with_server({"rsi": 50.0, "atr": 1.0, "local_only": 1}, {"rsi": 51.0, "atr": 2.0})
+    assert [(row["indicator"], row["match"]) for row in rows] == [("atr", False), ("rsi", True)]
@@ -0,0 +1,103 @@
+import gzip
+import json
+import random
+
+import pytest
+import requests
+
+import modules.json_stream as json_stream
+from modules.api_client import VortexAPIClient
+from modules.json_stream import ScanStreamDecoder
+from modules.shared_cache import SharedCache
+from tools.mock_upstream import MockMarket, start_in_thread
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if json_stream.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(json_stream, "orjson", None)
+    return request.param
+
+
+def scan_document():
+    coins = [dict(coin) for coin in MockMarket(300).scan()["coins"]]
+    # رشته‌هایی شبیه مرز رکوردها نباید decoder را گمراه کنند
+    coins[5]["name"] = 'we}, {"ird é'
+    return {
+        "success": True,
+        "timestamp": 1.5,
+        "coins": coins,
+        "meta": {"nested": {"list": [1, "x}],"]}},
+        "removed": ["é}"],
+    }
+
+
+def decode_in_chunks(body, sizes):
+    decoder = ScanStreamDecoder()
+    records = []
+    offset = 0
+    while offset < len(body):
+        size = next(sizes)
+        records += decoder.feed(body[offset:offset + size])
+        offset += size
+    return records, decoder.finish()
+
+
+@pytest.mark.parametrize("separators", [None, (",", ":")])
+def test_random_chunking_matches_json_loads(backend, separators):
+    document = scan_document()
+    body = json.dumps(document, separators=separators, ensure_ascii=False).encode()
+    rng = random.Random(7)
+    for _ in range(10):
+        records, header = decode_in_chunks(body, iter(lambda: rng.randint(1, 9000), None))
+        assert records == document["coins"]
+        assert header == {key: value for key, value in document.items() if key != "coins"}
+
+
+def test_byte_by_byte(backend):
+    body = json.dumps({"success": True, "coins": [{"symbol": "é", "v": 1}, {"symbol": "B"}], "t": 2}).encode()
+    records, header = decode_in_chunks(body, iter(lambda: 1, None))
+    assert records == [{"symbol": "é", "v": 1}, {"symbol": "B"}]
+    assert header == {"success": True, "t": 2}
+
+
+def test_response_without_coins(backend):
+    decoder = ScanStreamDecoder()
+    assert decoder.feed(b'{"success": false, "error": "coins unavailable"}') == []
+    assert decoder.finish() == {"success": False, "error": "coins unavailable"}
+
+
+def test_truncated_response_raises(backend):
+    decoder = ScanStreamDecoder()
+    assert decoder.feed(b'{"coins": [{"a": 1}, {"a"') == [{"a": 1}]
+    with pytest.raises(ValueError):
+        decoder.finish()
+
+
+def test_fetch_scan_streams_gzip_batches():
+    server, base_url = start_in_thread(coin_count=2000)
+    try:
+        batches = []
+        streamed = VortexAPIClient(base_url, shared=SharedCache({})).fetch_scan(
+            2000, on_batch=lambda coins: batches.append(len(coins))
+        )
+        plain = VortexAPIClient(base_url, shared=SharedCache({})).fetch_scan(2000)
+    finally:
+        server.shutdown()
+
+    assert len(batches) > 1 and sum(batches) == 2000
+    assert streamed["success"] and streamed["coins"] == plain["coins"]
+
+
+def test_mock_upstream_gzips_large_bodies():
+    server, base_url = start_in_thread(coin_count=50)
+    try:
+        response = requests.get(f"{base_url}/scan/vortexai", headers={"Accept-Encoding": "gzip"}, stream=True)
+        raw = response.raw.read()
+    finally:
+        server.shutdown()
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(raw))["coins"]) == 50
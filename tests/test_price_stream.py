@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from modules.api_client import PriceStream
+from tools.mock_upstream import start_in_thread
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def upstream():
+    # سرور هر اتصال استریم را بعد از stream_duration ثانیه می‌بندد
+    server, base_url = start_in_thread(coin_count=20, tick_interval=0.02, stream_duration=0.3)
+    yield server, base_url
+    server.shutdown()
+
+
+def test_stream_receives_ticks(upstream):
+    _, base_url = upstream
+    ticks = []
+    stream = PriceStream(base_url, on_tick=lambda symbol, price, volume, ts: ticks.append(symbol),
+                         backoff_base=0.05)
+    stream.start()
+    try:
+        assert wait_until(lambda: stream.tick_count >= 10)
+        assert ticks and stream.version == stream.tick_count
+        assert set(stream.quotes()) <= {f"C{i:04d}" for i in range(20)}
+    finally:
+        stream.stop()
+
+
+def test_stream_reconnects_after_server_closes(upstream):
+    server, base_url = upstream
+    stream = PriceStream(base_url, backoff_base=0.05, backoff_max=0.1)
+    stream.start()
+    try:
+        assert wait_until(lambda: stream.reconnects >= 2)
+        ticks_before = stream.tick_count
+        # بعد از اتصال مجدد tickها ادامه پیدا می‌کنند
+        assert wait_until(lambda: stream.tick_count > ticks_before)
+        assert server.RequestHandlerClass.counter["/api/stream/prices"] >= 3
+    finally:
+        stream.stop()
+
+
+def test_apply_to_merges_quotes():
+    stream = PriceStream("http://127.0.0.1:1")
+    stream._handle_event('[{"symbol": "BTC", "price": 101.5, "volume": 2000}, {"symbol": "ETH", "price": 9}]')
+    coins = [
+        {"symbol": "BTC", "realtime_price": 100, "realtime_volume": 1000, "name": "Bitcoin"},
+        {"symbol": "ETH", "realtime_price": 9, "realtime_volume": 50},
+        {"symbol": "SOL", "realtime_price": 3},
+    ]
+    updated, changed = stream.apply_to(coins)
+
+    assert changed == 1
+    assert updated[0] == {"symbol": "BTC", "realtime_price": 101.5, "realtime_volume": 2000, "name": "Bitcoin"}
+    assert updated[1] is coins[1] and updated[2] is coins[2]
+    # لیست ورودی (اسکن مشترک) تغییر نمی‌کند
+    assert coins[0]["realtime_price"] == 100
@@ -0,0 +1,118 @@
+import pytest
+import requests
+
+from modules.api_client import VortexAPIClient
+from modules.metrics import MetricsRegistry
+from modules.resilience import AdaptiveTimeout, CircuitBreaker, CircuitOpenError, RequestPolicy
+from modules.scheduler import RequestScheduler
+
+
+def response(status):
+    result = requests.Response()
+    result.status_code = status
+    result._content = b"{}"
+    return result
+
+
+class ScriptedSession:
+    """session جعلی: هر get نتیجه بعدی لیست را برمی‌گرداند (یا exception آن را raise می‌کند)"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.timeouts = []
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return response(outcome)
+
+
+def make_client(outcomes, **policy_args):
+    policy_args.setdefault("backoff_base", 0.001)
+    client = VortexAPIClient(
+        "http://upstream.test", policy=RequestPolicy(**policy_args),
+        scheduler=RequestScheduler(default_rate=(1000.0, 1000)), metrics=MetricsRegistry(),
+    )
+    client.session = ScriptedSession(outcomes)
+    return client
+
+
+def test_adaptive_timeout_tracks_latency():
+    timeout = AdaptiveTimeout(initial=5.0, minimum=0.5, maximum=30.0)
+    for _ in range(20):
+        timeout.observe(0.2)
+    assert 0.5 <= timeout.value < 1.0
+    before = timeout.value
+    timeout.on_timeout()
+    assert timeout.value == pytest.approx(2 * before)
+
+
+def test_adaptive_timeout_is_bounded():
+    timeout = AdaptiveTimeout(initial=20.0, minimum=2.0, maximum=30.0)
+    timeout.on_timeout()
+    assert timeout.value == 30.0
+    timeout.observe(0.01)
+    assert timeout.value >= 2.0
+
+
+def test_breaker_opens_after_threshold_and_probes_once(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("modules.resilience.time.time", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    now[0] += 11
+    assert [breaker.allow(), breaker.allow(), breaker.allow()] == [True, False, False]
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_failed_probe_reopens_breaker(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("modules.resilience.time.time", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    now[0] += 11
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+
+def test_request_retries_server_errors():
+    client = make_client([503, requests.ConnectionError("reset"), 200])
+    assert client._request("scan", "/scan").status_code == 200
+    assert len(client.session.timeouts) == 3
+
+
+def test_request_does_not_retry_non_idempotent():
+    client = make_client([503, 200])
+    with pytest.raises(requests.HTTPError):
+        client._request("scan", "/scan", idempotent=False)
+    assert len(client.session.timeouts) == 1
+
+
+def test_timeout_at_max_is_not_retried():
+    client = make_client([requests.Timeout("slow"), 200], initial_timeout=4.0, max_timeout=4.0)
+    with pytest.raises(requests.Timeout):
+        client._request("scan", "/scan")
+    assert client.session.timeouts == [4.0]
+
+
+def test_attempt_timeout_is_clipped_to_deadline():
+    client = make_client([200], initial_timeout=10.0, deadline=3.0)
+    client._request("scan", "/scan")
+    assert client.session.timeouts[0] <= 3.0
+
+
+def test_open_circuit_rejects_without_request():
+    client = make_client([503, 503], max_attempts=2, failure_threshold=2)
+    with pytest.raises(requests.HTTPError):
+        client._request("scan", "/scan")
+    with pytest.raises(CircuitOpenError):
+        client._request("scan", "/scan")
+    assert len(client.session.timeouts) == 2
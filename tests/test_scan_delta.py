@@ -0,0 +1,44 @@
+from modules.api_client import merge_scan_delta
+
+
+def test_merge_replaces_changed_coins_in_place():
+    cached = {
+        "success": True,
+        "timestamp": 1,
+        "coins": [{"symbol": "BTC", "price": 1}, {"symbol": "ETH", "price": 2}, {"symbol": "SOL", "price": 3}],
+    }
+    delta = {"success": True, "delta": True, "timestamp": 2, "coins": [{"symbol": "ETH", "price": 20}]}
+
+    merged = merge_scan_delta(cached, delta)
+
+    assert [coin["price"] for coin in merged["coins"]] == [1, 20, 3]
+    assert merged["timestamp"] == 2
+    assert merged["changed_count"] == 1
+    assert "delta" not in merged
+    # coinهای بدون تغییر همان اشیاء قبلی‌اند و اسکن کش‌شده تغییر نمی‌کند
+    assert merged["coins"][0] is cached["coins"][0]
+    assert cached["coins"][1]["price"] == 2 and cached["timestamp"] == 1
+
+
+def test_merge_removes_and_appends_coins():
+    cached = {"success": True, "coins": [{"symbol": "BTC"}, {"symbol": "ETH"}, {"symbol": "SOL"}]}
+    delta = {
+        "success": True,
+        "delta": True,
+        "coins": [{"symbol": "DOGE"}, {"symbol": "BTC", "price": 5}],
+        "removed": ["ETH"],
+    }
+
+    merged = merge_scan_delta(cached, delta)
+
+    assert [coin["symbol"] for coin in merged["coins"]] == ["BTC", "SOL", "DOGE"]
+    assert merged["coins"][0]["price"] == 5
+    assert "removed" not in merged
+    assert merged["changed_count"] == 2
+
+
+def test_empty_delta_keeps_scan():
+    cached = {"success": True, "coins": [{"symbol": "BTC"}]}
+    merged = merge_scan_delta(cached, {"success": True, "delta": True, "coins": []})
+    assert merged["coins"] == cached["coins"]
+    assert merged["changed_count"] == 0
@@ -0,0 +1,76 @@
+import random
+import time
+
+import numpy as np
+import pytest
+
+from modules.coin import Coin
+from modules.scan_recorder import ScanRecorder, scan_timestamp
+
+
+def make_scan(rng, universe, size):
+    return [
+        Coin(symbol, symbol, price=rng.random(), volume=rng.random() * 1e6, signal_strength=rng.random() * 10)
+        for symbol in rng.sample(universe, size)
+    ]
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    recorder = ScanRecorder(str(tmp_path))
+    rng = random.Random(1)
+    universe = [f"S{i}" for i in range(50)]
+    expected = {}
+    for timestamp in range(1, 41):
+        coins = make_scan(rng, universe, rng.randint(0, 30))
+        assert recorder.record(coins, float(timestamp)) == len(coins)
+        for coin in coins:
+            expected.setdefault(coin.symbol, []).append((float(timestamp), coin.price, coin.volume))
+    return recorder, expected
+
+
+def test_read_returns_symbol_series(recorded):
+    recorder, expected = recorded
+    for symbol, points in expected.items():
+        series = recorder.read(symbol)
+        assert list(series["time"]) == [point[0] for point in points]
+        assert np.allclose(series["price"], [point[1] for point in points])
+        assert np.allclose(series["volume"], [point[2] for point in points])
+
+
+def test_read_time_range(recorded):
+    recorder, expected = recorded
+    for symbol, points in expected.items():
+        series = recorder.read(symbol, start=10, end=25)
+        assert list(series["time"]) == [point[0] for point in points if 10 <= point[0] <= 25]
+    assert len(recorder.read("S1", start=100)) == 0
+    assert len(recorder.read("unknown")) == 0
+    assert list(recorder.scan_times(5, 7)) == [5.0, 6.0, 7.0]
+
+
+def test_reopen_and_ignore_old_scans(recorded, tmp_path):
+    recorder, expected = recorded
+    assert recorder.record([Coin("S1", "S1", price=1.0)], 3.0) == 0
+
+    reopened = ScanRecorder(str(tmp_path))
+    assert reopened.status()[:3] == recorder.status()[:3]
+    assert len(reopened.read("S1")) == len(expected["S1"])
+
+
+def test_interrupted_append_is_discarded(recorded, tmp_path):
+    recorder, expected = recorded
+    # ردیف‌های نیمه‌کاره بدون ثبت در scans.bin (مثل قطع برنامه وسط ثبت)
+    with open(tmp_path / "price.bin", "ab") as handle:
+        handle.write(b"\0" * 20)
+    assert len(recorder.read("S1")) == len(expected["S1"])
+
+    recorder.record([Coin("S1", "S1", price=9.0, volume=1.0)], 100.0)
+    series = recorder.read("S1")
+    assert series["time"][-1] == 100.0 and series["price"][-1] == 9.0
+    assert np.allclose(series["price"][:-1], [point[1] for point in expected["S1"]])
+
+
+def test_scan_timestamp():
+    assert scan_timestamp({"server_time": 5, "timestamp": 1}) == 5
+    assert scan_timestamp({"timestamp": 1_700_000_000_000}) == 1_700_000_000
+    assert scan_timestamp({"timestamp": "2024-01-01"}) == pytest.approx(time.time(), abs=5)
@@ -0,0 +1,81 @@
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from modules.scheduler import (
+    BACKGROUND, INTERACTIVE, DeferredError, RequestScheduler, TokenBucket, parse_retry_after,
+)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.1, abs=0.02)
+
+
+def test_interactive_requests_go_before_background():
+    scheduler = RequestScheduler({"scan": (20.0, 1)})
+    scheduler.acquire("scan")  # توکن burst مصرف می‌شود تا بقیه در صف بمانند
+    order = []
+
+    def worker(name, priority):
+        scheduler.acquire("scan", priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=worker, args=(f"bg{i}", BACKGROUND)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=worker, args=("user", INTERACTIVE))
+    interactive.start()
+    for thread in threads + [interactive]:
+        thread.join(5)
+
+    # اولین background پیش از رسیدن درخواست کاربر سر صف بوده است
+    assert order.index("user") <= 1
+    assert sorted(order) == ["bg0", "bg1", "bg2", "user"]
+
+
+def test_defer_blocks_endpoint_until_retry_after():
+    scheduler = RequestScheduler({"scan": (100.0, 10)})
+    scheduler.defer("scan", 0.3)
+    started = time.monotonic()
+    waited = scheduler.acquire("scan")
+    assert time.monotonic() - started >= 0.28
+    assert waited >= 0.28
+    # endpointهای دیگر متوقف نمی‌شوند
+    assert scheduler.acquire("technical") < 0.05
+    row = next(row for row in scheduler.rows() if row["endpoint"] == "scan")
+    assert row["throttled"] == 1
+    assert scheduler.queue_depth() == 0
+
+
+def test_acquire_fails_fast_when_deferred_beyond_timeout():
+    scheduler = RequestScheduler({"scan": (100.0, 10)})
+    scheduler.defer("scan", 120)
+    started = time.monotonic()
+    with pytest.raises(DeferredError):
+        scheduler.acquire("scan", timeout=5)
+    assert time.monotonic() - started < 0.1
+    assert scheduler.queue_depth() == 0
+
+
+def test_acquire_times_out_in_queue():
+    scheduler = RequestScheduler({"scan": (1.0, 1)})
+    scheduler.acquire("scan")
+    with pytest.raises(DeferredError):
+        scheduler.acquire("scan", timeout=0.1)
+    assert scheduler.queue_depth() == 0
+    # با مهلت کافی منتظر توکن بعدی می‌ماند
+    assert scheduler.acquire("scan", timeout=2) > 0.5
@@ -0,0 +1,27 @@
+from modules.coin import Coin
+from modules.streaming_indicators import IndicatorBook
+
+
+def test_scan_older_than_stream_tick_is_ignored():
+    book = IndicatorBook()
+    assert book.on_tick("BTC", 100.0, ts=20.0)
+    assert book.ingest_scan([Coin("BTC", "BTC", price=90.0), Coin("ETH", "ETH", price=5.0)], 10.0) == 1
+    assert book.snapshot("BTC")[1] == 1
+    assert book.snapshot("ETH")[1] == 1
+
+
+def test_repeated_scan_is_not_replayed():
+    book = IndicatorBook()
+    coins = [Coin("BTC", "BTC", price=100.0, volume=5e9)]
+    assert book.ingest_scan(coins, 1_700_000_000_000) == 1
+    assert book.ingest_scan(coins, 1_700_000_000.0) == 0
+    assert book.snapshot("BTC")[1] == 1
+
+
+def test_obv_uses_tick_volume_only():
+    book = IndicatorBook()
+    book.ingest_scan([Coin("BTC", "BTC", price=100.0, volume=5e9)], 1.0)
+    book.on_tick("BTC", 101.0, 10.0, ts=2.0)
+    book.on_tick("BTC", 100.5, 4.0, ts=3.0)
+    book.on_tick("BTC", 102.0, None, ts=4.0)
+    assert book.snapshot("BTC")[0]["obv"] == 6.0
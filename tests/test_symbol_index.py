@@ -0,0 +1,38 @@
+import pytest
+
+from modules.symbol_index import SymbolIndex
+
+
+@pytest.fixture
+def index():
+    return SymbolIndex(
+        ["BTC", "BCH", "ETH", "BTCB", "CASH", "WBTC", "BTC"],
+        ["Bitcoin", "Bitcoin Cash", "Ethereum", "Bitcoin BEP2", "Cash Token", "Wrapped Bitcoin", "Bitcoin Dup"],
+    )
+
+
+def test_get_returns_first_row_of_symbol(index):
+    assert index.get("BTC") == 0
+    assert index.get("ETH") == 2
+    assert index.get("DOGE") is None
+
+
+def test_symbol_prefix_ranks_before_name_prefix(index):
+    # symbolهای کوتاه‌تر اول، بعد کوین‌هایی که نام یا کلمه‌ای از نامشان با "b" شروع می‌شود
+    assert index.search("b") == [0, 1, 6, 3, 5]
+
+
+def test_name_word_and_substring_matches(index):
+    # CASH (symbol) اول، بعد Cash Token (نام)، بعد کلمه دوم "Bitcoin Cash"
+    assert index.search("cash") == [4, 1]
+    # بدون تطابق پیشوندی: زیررشته symbol یا نام
+    assert index.search("rapped") == [5]
+    assert index.search("btc")[:3] == [0, 6, 3]
+    assert 5 in index.search("btc")
+
+
+def test_search_is_case_insensitive_and_limited(index):
+    assert index.search("  ETH ") == [2]
+    assert index.search("bit", limit=2) == [0, 1]
+    assert index.search("") == list(range(7))
+    assert index.search("zzz") == []
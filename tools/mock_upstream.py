@@ -0,0 +1,248 @@
+"""
+سرور جایگزین محلی برای توسعه، تست و بنچمارک بدون سرور اصلی
+
+    python tools/mock_upstream.py --port 8765 --coins 100 --latency 0.05
+    VORTEX_API_BASE_URL=http://127.0.0.1:8765/api streamlit run app.py
+"""
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HISTORY_POINTS = {"1h": 60, "4h": 96, "24h": 96, "7d": 168, "30d": 180, "90d": 270}
+
+
+class MockMarket:
+    """بازار مصنوعی با قیمت‌های random walk"""
+
+    def __init__(self, coin_count=100, seed=42):
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.resize(coin_count)
+
+    def resize(self, coin_count):
+        """ساخت مجدد بازار با تعداد کوین داده شده"""
+        with self.lock:
+            self.rng = random.Random(self.seed)
+            self.coins = [self._make_coin(i) for i in range(coin_count)]
+            self.by_symbol = {coin["symbol"]: coin for coin in self.coins}
+
+    def _make_coin(self, index):
+        price = round(self.rng.uniform(0.01, 50000), 4)
+        return {
+            "symbol": f"C{index:04d}",
+            "name": f"Coin {index}",
+            "price": price,
+            "realtime_price": price,
+            "volume": self.rng.uniform(1e5, 5e9),
+            "realtime_volume": self.rng.uniform(1e5, 5e9),
+            "priceChange1h": self.rng.uniform(-5, 5),
+            "priceChange1d": self.rng.uniform(-15, 15),
+            "priceChange1w": self.rng.uniform(-30, 30),
+            "VortexAI_analysis": {
+                "signal_strength": self.rng.uniform(0, 10),
+                "volume_anomaly": self.rng.random() < 0.1,
+                "trend": self.rng.choice(["up", "down", "neutral"]),
+                "volatility_score": self.rng.random(),
+            },
+        }
+
+    def tick(self, count):
+        """حرکت تصادفی قیمت چند کوین - خروجی لیست tickها"""
+        ticks = []
+        with self.lock:
+            for coin in self.rng.sample(self.coins, min(count, len(self.coins))):
+                coin["realtime_price"] = round(coin["realtime_price"] * (1 + self.rng.gauss(0, 0.002)), 6)
+                tick_volume = self.rng.uniform(0, 1e4)
+                coin["realtime_volume"] += tick_volume
+                ticks.append({
+                    "symbol": coin["symbol"],
+                    "price": coin["realtime_price"],
+                    "volume": coin["realtime_volume"],
+                    "tick_volume": tick_volume,
+                    "ts": time.time(),
+                })
+        return ticks
+
+    def scan(self, limit=None):
+        with self.lock:
+            coins = self.coins if limit is None else self.coins[:limit]
+            return {"success": True, "coins": list(coins), "timestamp": time.time()}
+
+    def history(self, symbol, timeframe, since=None):
+        coin = self.by_symbol.get(symbol)
+        if coin is None:
+            return {"success": False, "error": f"unknown symbol {symbol}"}
+        points = HISTORY_POINTS.get(timeframe, 96)
+        rng = random.Random(f"{symbol}-{timeframe}")
+        step = 3600
+        end = int(time.time()) // step * step
+        price = coin["price"]
+        candles = []
+        for index in range(points):
+            close = price * (1 + rng.gauss(0, 0.01))
+            candles.append({
+                "time": end - (points - index) * step,
+                "open": price,
+                "high": max(price, close) * (1 + rng.random() * 0.005),
+                "low": min(price, close) * (1 - rng.random() * 0.005),
+                "close": close,
+                "volume": rng.uniform(1e3, 1e6),
+            })
+            price = close
+        if since is not None:
+            candles = [candle for candle in candles if candle["time"] > since]
+        return {"success": True, "symbol": symbol, "timeframe": timeframe, "history": candles}
+
+    def technical(self, symbol):
+        coin = self.by_symbol.get(symbol)
+        if coin is None:
+            return {"success": False, "error": f"unknown symbol {symbol}"}
+        rng = random.Random(symbol)
+        price = coin["price"]
+        return {
+            "success": True,
+            "symbol": symbol,
+            "current_price": price,
+            "technical_indicators": {
+                "rsi": rng.uniform(10, 90),
+                "macd": rng.gauss(0, 1),
+                "stochastic_k": rng.uniform(0, 100),
+                "williams_r": rng.uniform(-100, 0),
+                "bollinger_upper": price * 1.05,
+                "bollinger_lower": price * 0.95,
+                "moving_avg_20": price * 0.99,
+                "moving_avg_50": price * 0.97,
+                "atr": price * 0.02,
+                "adx": rng.uniform(5, 60),
+                "obv": rng.uniform(-1e7, 1e7),
+                "cci": rng.uniform(-200, 200),
+            },
+            "support_resistance": {
+                "support": [price * 0.95, price * 0.9],
+                "resistance": [price * 1.05, price * 1.1],
+            },
+            "vortexai_analysis": {
+                "market_sentiment": rng.choice(["BULLISH", "BEARISH", "NEUTRAL"]),
+                "risk_level": rng.choice(["LOW", "MEDIUM", "HIGH"]),
+                "prediction_confidence": rng.random(),
+                "top_opportunities": [],
+            },
+        }
+
+
+class MockUpstreamHandler(BaseHTTPRequestHandler):
+    market = None
+    counter = None
+    latency = 0.0
+    honor_limit = True
+    tick_interval = 0.5
+    ticks_per_event = 5
+    stream_duration = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(body) > 1024:
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.counter[re.sub(r"/coin/[^/]+/", "/coin/{symbol}/", path)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        history = re.fullmatch(r"/api/coin/([^/]+)/history/([^/]+)", path)
+        technical = re.fullmatch(r"/api/coin/([^/]+)/technical", path)
+        if path == "/api/health-combined":
+            self._send_json({
+                "status": "healthy",
+                "websocket_status": {"connected": True, "active_coins": len(self.market.coins)},
+                "api_status": {"requests_count": sum(self.counter.values())},
+                "gist_status": {"total_coins": len(self.market.coins)},
+            })
+        elif path == "/api/scan/vortexai":
+            limit = int(query.get("limit", 100)) if self.honor_limit else None
+            self._send_json(self.market.scan(limit))
+        elif technical:
+            self._send_json(self.market.technical(technical.group(1)))
+        elif history:
+            since = int(float(query["since"])) if "since" in query else None
+            self._send_json(self.market.history(history.group(1), history.group(2), since))
+        elif path == "/api/analysis":
+            symbol = query.get("symbol", "").split("_")[0].upper()
+            self._send_json(self.market.technical(symbol))
+        elif path == "/api/stream/prices":
+            self._stream_prices()
+        else:
+            self._send_json({"success": False, "error": f"unknown endpoint {path}"}, status=404)
+
+    def _stream_prices(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        started = time.time()
+        try:
+            while self.stream_duration is None or time.time() - started < self.stream_duration:
+                event = json.dumps(self.market.tick(self.ticks_per_event))
+                self.wfile.write(f"data: {event}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(self.tick_interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_server(port=0, coin_count=100, tick_interval=0.5, stream_duration=None,
+                latency=0.0, honor_limit=True):
+    """ساخت سرور (port=0 یعنی پورت آزاد تصادفی)"""
+    handler = type("Handler", (MockUpstreamHandler,), {
+        "market": MockMarket(coin_count),
+        "counter": Counter(),
+        "latency": latency,
+        "honor_limit": honor_limit,
+        "tick_interval": tick_interval,
+        "stream_duration": stream_duration,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(**kwargs):
+    """اجرای سرور در thread پس‌زمینه - خروجی (server, base_url)"""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VortexAI mock upstream")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--coins", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--tick-interval", type=float, default=0.5)
+    parser.add_argument("--ignore-limit", action="store_true", help="always return the whole universe")
+    args = parser.parse_args()
+    server = make_server(
+        args.port, args.coins, args.tick_interval,
+        latency=args.latency, honor_limit=not args.ignore_limit
+    )
+    print(f"Mock upstream on http://127.0.0.1:{server.server_address[1]}/api")
+    server.serve_forever()